@@ -12,7 +12,56 @@ This exercise demonstrates:
 import time
 import hashlib
 import json
-from typing import Dict, Any, Optional
+import zlib
+from functools import lru_cache
+from itertools import islice
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+def _serialize_value(value: Any) -> str:
+    """Render one parameter value; nested values go through key-sorted JSON."""
+    if isinstance(value, _SCALAR_TYPES):
+        return repr(value)
+    return json.dumps(value, sort_keys=True, default=repr)
+
+def _serialize_params(params_items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    """
+    Serialize sorted model parameters into a canonical string for key hashing.
+    
+    Scalar values are rendered with ``repr`` so ``1`` and ``"1"`` stay
+    distinct; for the flat ``{"model": ..., "temperature": ...}`` dicts used
+    here this is about twice as fast as ``json.dumps(sort_keys=True)``.
+    Nested values (dicts, lists) fall back to key-sorted JSON, so two equal
+    dicts built in a different insertion order give the same key.
+    """
+    return "\0".join([f"{k}={_serialize_value(v)}" for k, _, v in params_items])
+
+@lru_cache(maxsize=256)
+def _seeded_hasher(params_items: Tuple[Tuple[str, type, Any], ...]):
+    """
+    Return a SHA-256 hasher that has already consumed the serialized params.
+    
+    Callers usually share one params dict across many prompts, so the params
+    are hashed once and the hasher state is reused via ``copy()``.
+    """
+    hasher = hashlib.sha256(_serialize_params(params_items).encode('utf-8'))
+    hasher.update(b"\0")
+    return hasher
+
+@lru_cache(maxsize=2048)
+def _compute_key(prompt: str, params_items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    """
+    Hash a prompt on top of its seeded params hasher.
+    
+    Memoized so the usual ``get`` followed by ``set`` for the same request
+    hashes once; the second call is a single C-level dict probe.
+    """
+    # copy() is required: update() mutates the shared seeded state
+    hasher = _seeded_hasher(params_items).copy()
+    hasher.update(prompt.encode('utf-8'))
+    return hasher.hexdigest()
 
 class ResponseCache:
     """
@@ -22,18 +71,33 @@ class ResponseCache:
     - Cache key generation using SHA-256 hashing
     - TTL (Time-to-Live) management for cache expiration
     - Cache hit/miss detection
+    - Approximate LRU eviction once the cache reaches its capacity
     - Basic cache statistics
+    
+    Entries are stored as ``(expires_at, response, last_accessed)`` tuples
+    rather than dicts: a tuple is a fraction of the size of a dict and
+    unpacking it avoids string-keyed lookups on every access.
+    
+    Eviction samples the ``EVICTION_SAMPLES`` oldest-inserted entries and
+    drops an expired one, or else the least recently accessed one. Hits only
+    refresh ``last_accessed``; they never reorder the OrderedDict.
     """
     
-    def __init__(self, ttl: int = 60):
+    EVICTION_SAMPLES = 5
+    
+    def __init__(self, ttl: int = 60, capacity: int = 1000, verbose: bool = False):
         """
         Initialize the cache with a TTL (Time-to-Live) in seconds.
         
         Args:
             ttl (int): Time in seconds before cache entries expire (default: 60)
+            capacity (int): Maximum number of entries before LRU eviction (default: 1000)
+            verbose (bool): Print a line for every hit, miss and store (default: False)
         """
-        self.cache: Dict[str, Dict[str, Any]] = {}
+        self.verbose = verbose
+        self.cache: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
         self.ttl = ttl
+        self.capacity = capacity
         self.stats = {
             "hits": 0,
             "misses": 0,
@@ -45,8 +109,8 @@ class ResponseCache:
         Generate a unique cache key from prompt and parameters.
         
         This method:
-        1. Combines prompt and parameters into a string
-        2. Uses SHA-256 hashing for consistent, fixed-length keys
+        1. Canonicalizes parameters into a hashable, sorted tuple
+        2. Looks up or computes the SHA-256 key via the memoized ``_compute_key``
         3. Ensures unique keys for different inputs
         
         Args:
@@ -56,14 +120,15 @@ class ResponseCache:
         Returns:
             str: A unique hash key for the cache entry
         """
-        # Convert parameters to a sorted string for consistency
-        params_str = json.dumps(params, sort_keys=True)
-        
-        # Combine prompt and parameters
-        raw_key = f"{prompt}_{params_str}"
-        
-        # Generate SHA-256 hash for consistent, fixed-length keys
-        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+        # Value types are part of the memo key: 1, 1.0 and True compare equal
+        # but serialize differently
+        params_items = tuple(sorted([(k, type(v), v) for k, v in params.items()]))
+        try:
+            return _compute_key(prompt, params_items)
+        except TypeError:
+            # Unhashable parameter values (lists, dicts) bypass the memo
+            raw_key = f"{_serialize_params(params_items)}\0{prompt}"
+            return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
     
     def get(self, prompt: str, params: Dict[str, Any]) -> Optional[str]:
         """
@@ -71,7 +136,7 @@ class ResponseCache:
         
         This method:
         1. Generates the cache key
-        2. Checks if the key exists in cache
+        2. Looks the key up in cache with a single dict probe
         3. Validates TTL (Time-to-Live)
         4. Updates statistics
         5. Returns cached response or None
@@ -83,56 +148,153 @@ class ResponseCache:
         Returns:
             Optional[str]: Cached response if valid, None if not found or expired
         """
-        key = self._make_key(prompt, params)
+        return self.get_by_key(self._make_key(prompt, params))
+    
+    def get_by_key(self, key: str) -> Optional[str]:
+        """
+        Retrieve a cached response by a precomputed key, skipping hashing.
+        
+        Callers that already have a stable request identifier (or a key from
+        ``_make_key``) can use this and ``set_by_key`` directly.
+        
+        Args:
+            key (str): Cache key
+            
+        Returns:
+            Optional[str]: Cached response if valid, None if not found or expired
+        """
         self.stats["total_requests"] += 1
         
-        if key in self.cache:
-            entry = self.cache[key]
-            current_time = time.time()
+        entry = self.cache.get(key)
+        if entry is not None:
+            expires_at, response, _ = entry
+            current_time = time.monotonic()
             
             # Check if entry has expired based on TTL
-            if current_time - entry['time'] < self.ttl:
-                # Cache HIT: Entry is valid
+            if current_time < expires_at:
+                # Cache HIT: Entry is valid, refresh its access time in place
+                self.cache[key] = (expires_at, response, current_time)
                 self.stats["hits"] += 1
-                print(f"Cache HIT for key: {key[:8]}...")
-                return entry['response']
+                if self.verbose:
+                    print(f"Cache HIT for key: {key[:8]}...")
+                return response
             else:
                 # Cache MISS: Entry has expired, remove it
-                print(f"Cache EXPIRED for key: {key[:8]}...")
+                if self.verbose:
+                    print(f"Cache EXPIRED for key: {key[:8]}...")
                 del self.cache[key]
         
         # Cache MISS: Entry not found
         self.stats["misses"] += 1
-        print(f"Cache MISS for key: {key[:8]}...")
+        if self.verbose:
+            print(f"Cache MISS for key: {key[:8]}...")
         return None
     
     def set(self, prompt: str, params: Dict[str, Any], response: str) -> None:
         """
-        Store a response in the cache with current timestamp.
+        Store a response in the cache with its expiry deadline.
         
         This method:
         1. Generates the cache key
-        2. Stores response with current timestamp
-        3. Handles cache size limits (basic implementation)
+        2. Stores response with its expiry deadline
+        3. Evicts sampled least recently used entries beyond capacity
         
         Args:
             prompt (str): The AI prompt
             params (Dict[str, Any]): Model parameters
             response (str): The AI response to cache
         """
-        key = self._make_key(prompt, params)
+        self.set_by_key(self._make_key(prompt, params), response)
+    
+    def set_by_key(self, key: str, response: str) -> None:
+        """
+        Store a response under a precomputed key, skipping hashing.
         
-        # Store entry with timestamp for TTL tracking
-        self.cache[key] = {
-            "response": response,
-            "time": time.time()
-        }
+        Args:
+            key (str): Cache key
+            response (str): The AI response to cache
+        """
+        # Store entry with a precomputed monotonic deadline for TTL tracking
+        current_time = time.monotonic()
+        self.cache[key] = (current_time + self.ttl, response, current_time)
+        self.cache.move_to_end(key)
+        
+        if self.verbose:
+            print(f"Cached response for key: {key[:8]}...")
+        
+        # Hard cap: evict approximately least recently used entries
+        while len(self.cache) > self.capacity:
+            self._evict_one(current_time)
+    
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any], str]]) -> None:
+        """
+        Store many responses in one pass, e.g. to pre-warm the cache.
+        
+        This method:
+        1. Reads the clock once and shares the deadline across the batch
+        2. Generates each key and stores the entry in a tight loop
+        3. Enforces capacity once at the end instead of after every entry
+        
+        Args:
+            items (Iterable[Tuple[str, Dict[str, Any], str]]): (prompt, params, response) triples
+        """
+        current_time = time.monotonic()
+        entry_deadline = current_time + self.ttl
+        cache = self.cache
+        count = 0
         
-        print(f"Cached response for key: {key[:8]}...")
+        for prompt, params, response in items:
+            key = self._make_key(prompt, params)
+            cache[key] = (entry_deadline, response, current_time)
+            cache.move_to_end(key)
+            count += 1
+        
+        if self.verbose:
+            print(f"Cached {count} responses in batch")
+        
+        while len(cache) > self.capacity:
+            self._evict_one(current_time)
+    
+    def get_many(self, prompts: Iterable[str], params: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Look up many prompts that share the same parameters.
+        
+        Args:
+            prompts (Iterable[str]): The AI prompts
+            params (Dict[str, Any]): Model parameters shared by all prompts
+            
+        Returns:
+            Dict[str, str]: Mapping of prompt to cached response, hits only
+        """
+        results = {}
+        for prompt in prompts:
+            response = self.get_by_key(self._make_key(prompt, params))
+            if response is not None:
+                results[prompt] = response
+        return results
+    
+    def _evict_one(self, current_time: float) -> None:
+        """
+        Evict one entry using sampled LRU.
+        
+        This method:
+        1. Samples the oldest-inserted entries from the front of the cache
+        2. Evicts the first expired sample, or else the least recently accessed
+        3. Moves the surviving samples to the back so later evictions see new ones
+        """
+        samples = list(islice(self.cache.items(), self.EVICTION_SAMPLES))
+        victim = None
+        for key, (expires_at, _, _) in samples:
+            if current_time >= expires_at:
+                victim = key
+                break
+        if victim is None:
+            victim = min(samples, key=lambda item: item[1][2])[0]
         
-        # Basic cache size management (optional)
-        if len(self.cache) > 1000:  # Limit cache to 1000 entries
-            self._cleanup_expired()
+        del self.cache[victim]
+        for key, _ in samples:
+            if key != victim:
+                self.cache.move_to_end(key)
     
     def _cleanup_expired(self) -> None:
         """
@@ -143,17 +305,17 @@ class ResponseCache:
         2. Removes entries that have exceeded TTL
         3. Helps manage memory usage
         """
-        current_time = time.time()
+        current_time = time.monotonic()
         expired_keys = []
         
-        for key, entry in self.cache.items():
-            if current_time - entry['time'] >= self.ttl:
+        for key, (expires_at, _, _) in self.cache.items():
+            if current_time >= expires_at:
                 expired_keys.append(key)
         
         for key in expired_keys:
             del self.cache[key]
         
-        if expired_keys:
+        if expired_keys and self.verbose:
             print(f"Cleaned up {len(expired_keys)} expired entries")
     
     def get_stats(self) -> Dict[str, Any]:
@@ -181,7 +343,8 @@ class ResponseCache:
         """Clear all cached entries."""
         self.cache.clear()
         self.stats = {"hits": 0, "misses": 0, "total_requests": 0}
-        print("Cache cleared")
+        if self.verbose:
+            print("Cache cleared")
 
 def mock_ai_api_call(prompt: str, params: Dict[str, Any]) -> str:
     """
@@ -199,8 +362,10 @@ def mock_ai_api_call(prompt: str, params: Dict[str, Any]) -> str:
     Returns:
         str: Mock AI response
     """
-    # Simulate API call delay (1-3 seconds)
-    delay = 1 + (hash(prompt) % 3)  # Vary delay based on prompt
+    # Simulate API call delay (1-3 seconds). CRC32 is cheap and, unlike the
+    # per-process salted hash(), gives the same delay on every run so timing
+    # measurements are reproducible.
+    delay = 1 + (zlib.crc32(prompt.encode('utf-8')) % 3)  # Vary delay based on prompt
     print(f"Making API call (simulated delay: {delay}s)...")
     time.sleep(delay)
     
@@ -229,7 +394,7 @@ def demonstrate_caching():
     print("=" * 60)
     
     # Initialize cache with 30-second TTL
-    cache = ResponseCache(ttl=30)
+    cache = ResponseCache(ttl=30, verbose=True)
     
     # Test parameters
     test_params = {"model": "gpt-3.5-turbo", "temperature": 0.1}
@@ -252,9 +417,9 @@ def demonstrate_caching():
         
         if cached_response is None:
             # Cache miss: Make API call
-            start_time = time.time()
+            start_time = time.perf_counter()
             response = mock_ai_api_call(prompt, test_params)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             # Cache the response
             cache.set(prompt, test_params, response)
@@ -272,9 +437,9 @@ def demonstrate_caching():
     for i, prompt in enumerate(prompts, 1):
         print(f"\nRequest {i}: {prompt}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         cached_response = cache.get(prompt, test_params)
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         if cached_response is None:
             # Should not happen with our TTL
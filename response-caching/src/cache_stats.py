@@ -12,9 +12,38 @@ This exercise demonstrates:
 import time
 import hashlib
 import json
+import zlib
 import statistics
-from typing import Dict, Any, Optional, List
-from collections import defaultdict
+from array import array
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple
+from collections import deque
+
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+def _serialize_value(value: Any) -> str:
+    """Render one parameter value; nested values go through key-sorted JSON."""
+    if isinstance(value, _SCALAR_TYPES):
+        return repr(value)
+    return json.dumps(value, sort_keys=True, default=repr)
+
+def _serialize_params(params_items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    """Serialize sorted params as ``key=repr(value)`` pairs, nested values as sorted JSON."""
+    return "\0".join([f"{k}={_serialize_value(v)}" for k, _, v in params_items])
+
+@lru_cache(maxsize=256)
+def _seeded_hasher(params_items: Tuple[Tuple[str, type, Any], ...]):
+    """Return a SHA-256 hasher pre-fed with the serialized params."""
+    hasher = hashlib.sha256(_serialize_params(params_items).encode('utf-8'))
+    hasher.update(b"\0")
+    return hasher
+
+@lru_cache(maxsize=2048)
+def _compute_key(prompt: str, params_items: Tuple[Tuple[str, type, Any], ...]) -> str:
+    """Memoized cache key: a copy of the seeded hasher plus the prompt."""
+    hasher = _seeded_hasher(params_items).copy()
+    hasher.update(prompt.encode('utf-8'))
+    return hasher.hexdigest()
 
 class CachePerformanceMonitor:
     """
@@ -25,32 +54,57 @@ class CachePerformanceMonitor:
     - Response time analysis
     - Cache efficiency metrics
     - Performance optimization recommendations
+    
+    Response-time samples are kept in fixed-capacity ``array('d')`` ring
+    buffers (contiguous C doubles) so memory stays bounded over long sessions.
+    Hit-rate and cache-size history are ``deque(maxlen=max_history)`` of
+    ``(timestamp, value)`` tuples for the same reason, sampled only every
+    ``history_interval`` requests; current values come from the counters.
     """
     
-    def __init__(self):
-        """Initialize the performance monitoring system."""
+    def __init__(self, max_samples: int = 10000, max_history: int = 4096,
+                 history_interval: int = 128):
+        """
+        Initialize the performance monitoring system.
+        
+        Args:
+            max_samples (int): Response-time samples kept per category; once
+                full, the oldest sample is overwritten (default: 10000)
+            max_history (int): Hit-rate/cache-size history points kept (default: 4096)
+            history_interval (int): Requests between history samples (default: 128)
+        """
+        self.max_samples = max_samples
+        self.history_interval = history_interval
+        self._next_hit_rate_record = 0
+        self._next_cache_size_record = 0
+        self._sample_cursor = {"cache_hits": 0, "cache_misses": 0, "api_calls": 0}
         self.stats = {
             "total_requests": 0,
             "hits": 0,
             "misses": 0,
             "response_times": {
-                "cache_hits": [],
-                "cache_misses": [],
-                "api_calls": []
+                "cache_hits": array('d'),
+                "cache_misses": array('d'),
+                "api_calls": array('d')
             },
-            "cache_size_history": [],
-            "hit_rate_history": [],
-            "performance_by_key": defaultdict(lambda: {
-                "requests": 0,
-                "hits": 0,
-                "misses": 0,
-                "avg_response_time": 0
-            })
+            "cache_size_history": deque(maxlen=max_history),
+            "hit_rate_history": deque(maxlen=max_history),
+            "performance_by_key": {}
         }
         
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
         self.session_id = int(time.time())
     
+    def _record_time(self, category: str, value: float) -> None:
+        """Append a response-time sample, overwriting the oldest once full."""
+        samples = self.stats["response_times"][category]
+        if len(samples) < self.max_samples:
+            samples.append(value)
+        else:
+            cursor = self._sample_cursor[category]
+            samples[cursor] = value
+            self._sample_cursor[category] = (cursor + 1) % self.max_samples
+    
     def record_request(self, key: str, is_hit: bool, response_time: float, 
                       cache_size: int = 0, api_call_time: float = 0):
         """
@@ -68,44 +122,38 @@ class CachePerformanceMonitor:
         # Update basic stats
         if is_hit:
             self.stats["hits"] += 1
-            self.stats["response_times"]["cache_hits"].append(response_time)
+            self._record_time("cache_hits", response_time)
         else:
             self.stats["misses"] += 1
-            self.stats["response_times"]["cache_misses"].append(response_time)
+            self._record_time("cache_misses", response_time)
             if api_call_time > 0:
-                self.stats["response_times"]["api_calls"].append(api_call_time)
+                self._record_time("api_calls", api_call_time)
         
         # Update per-key statistics
-        key_stats = self.stats["performance_by_key"][key]
+        performance_by_key = self.stats["performance_by_key"]
+        key_stats = performance_by_key.get(key)
+        if key_stats is None:
+            key_stats = {"requests": 0, "hits": 0, "misses": 0, "total_response_time": 0.0}
+            performance_by_key[key] = key_stats
         key_stats["requests"] += 1
         if is_hit:
             key_stats["hits"] += 1
         else:
             key_stats["misses"] += 1
         
-        # Update average response time for this key
-        if key_stats["requests"] == 1:
-            key_stats["avg_response_time"] = response_time
-        else:
-            # Calculate running average
-            key_stats["avg_response_time"] = (
-                (key_stats["avg_response_time"] * (key_stats["requests"] - 1) + response_time) 
-                / key_stats["requests"]
-            )
-        
-        # Record cache size history
-        if cache_size > 0:
-            self.stats["cache_size_history"].append({
-                "timestamp": time.time(),
-                "size": cache_size
-            })
-        
-        # Record hit rate history
-        current_hit_rate = (self.stats["hits"] / self.stats["total_requests"]) * 100
-        self.stats["hit_rate_history"].append({
-            "timestamp": time.time(),
-            "hit_rate": current_hit_rate
-        })
+        # Accumulate response time; the average is derived on demand
+        key_stats["total_response_time"] += response_time
+        
+        # Sample history on a throttled tick instead of every request
+        total = self.stats["total_requests"]
+        if cache_size > 0 and total >= self._next_cache_size_record:
+            self._next_cache_size_record = total + self.history_interval
+            self.stats["cache_size_history"].append((time.time(), cache_size))
+        
+        if total >= self._next_hit_rate_record:
+            self._next_hit_rate_record = total + self.history_interval
+            current_hit_rate = (self.stats["hits"] / total) * 100
+            self.stats["hit_rate_history"].append((time.time(), current_hit_rate))
     
     def get_comprehensive_stats(self) -> Dict[str, Any]:
         """
@@ -127,27 +175,33 @@ class CachePerformanceMonitor:
         api_call_times = self.stats["response_times"]["api_calls"]
         
         # Calculate averages and percentiles
-        avg_cache_hit_time = statistics.mean(cache_hit_times) if cache_hit_times else 0
-        avg_cache_miss_time = statistics.mean(cache_miss_times) if cache_miss_times else 0
-        avg_api_call_time = statistics.mean(api_call_times) if api_call_times else 0
+        # fmean sums the C doubles in float arithmetic; statistics.mean uses exact
+        # fractions and is ~40x slower on large sample buffers
+        avg_cache_hit_time = statistics.fmean(cache_hit_times) if cache_hit_times else 0
+        avg_cache_miss_time = statistics.fmean(cache_miss_times) if cache_miss_times else 0
+        avg_api_call_time = statistics.fmean(api_call_times) if api_call_times else 0
         
         # Calculate percentiles for response times
         p95_cache_hit = statistics.quantiles(cache_hit_times, n=20)[-1] if len(cache_hit_times) > 1 else 0
         p95_cache_miss = statistics.quantiles(cache_miss_times, n=20)[-1] if len(cache_miss_times) > 1 else 0
         
         # Calculate session duration
-        session_duration = time.time() - self.start_time
+        session_duration = time.monotonic() - self.start_time
         
         # Calculate requests per second
         requests_per_second = total / session_duration if session_duration > 0 else 0
         
         # Find most requested keys
         key_performance = self.stats["performance_by_key"]
-        most_requested_keys = sorted(
-            key_performance.items(), 
-            key=lambda x: x[1]["requests"], 
-            reverse=True
-        )[:5]
+        most_requested_keys = [
+            (key, {**key_stats,
+                   "avg_response_time": key_stats["total_response_time"] / key_stats["requests"]})
+            for key, key_stats in sorted(
+                key_performance.items(), 
+                key=lambda x: x[1]["requests"], 
+                reverse=True
+            )[:5]
+        ]
         
         return {
             "basic_stats": {
@@ -222,7 +276,7 @@ class CachePerformanceMonitor:
         # Analyze response times
         cache_hit_times = self.stats["response_times"]["cache_hits"]
         if cache_hit_times:
-            avg_hit_time = statistics.mean(cache_hit_times)
+            avg_hit_time = statistics.fmean(cache_hit_times)
             if avg_hit_time > 0.1:  # More than 100ms
                 recommendations.append("Slow cache hits: Consider optimizing cache storage")
         
@@ -243,7 +297,7 @@ class CachePerformanceMonitor:
 
 def mock_ai_api_call(prompt: str, params: Dict[str, Any]) -> str:
     """Simulate an AI API call with artificial delay."""
-    delay = 1 + (hash(prompt) % 3)
+    delay = 1 + (zlib.crc32(prompt.encode('utf-8')) % 3)  # Deterministic across runs
     print(f"Making API call (simulated delay: {delay}s)...")
     time.sleep(delay)
     
@@ -259,53 +313,70 @@ def mock_ai_api_call(prompt: str, params: Dict[str, Any]) -> str:
 class MonitoredCache:
     """
     A cache with integrated performance monitoring.
+    
+    Entries are ``(expires_at, response)`` tuples keyed by cache key. A
+    ``__slots__`` entry class saves 8 bytes per entry but is ~2x slower to
+    create, with no faster reads, so plain tuples are kept.
     """
     
-    def __init__(self, ttl: int = 60):
-        """Initialize cache with monitoring."""
-        self.cache = {}
+    def __init__(self, ttl: int = 60, verbose: bool = False):
+        """Initialize cache with monitoring; ``verbose`` prints every hit/miss/store."""
+        self.verbose = verbose
+        self.cache: Dict[str, Tuple[float, str]] = {}
         self.ttl = ttl
         self.monitor = CachePerformanceMonitor()
     
     def _make_key(self, prompt: str, params: Dict[str, Any]) -> str:
-        """Generate cache key."""
-        params_str = json.dumps(params, sort_keys=True)
-        raw_key = f"{prompt}_{params_str}"
-        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+        """Generate cache key (memoized per prompt and sorted params)."""
+        # Value types are part of the memo key: 1, 1.0 and True compare equal
+        # but serialize differently
+        params_items = tuple(sorted([(k, type(v), v) for k, v in params.items()]))
+        try:
+            return _compute_key(prompt, params_items)
+        except TypeError:
+            # Unhashable parameter values bypass the memo
+            raw_key = f"{_serialize_params(params_items)}\0{prompt}"
+            return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
     
     def get(self, prompt: str, params: Dict[str, Any]) -> Optional[str]:
         """Get cached response with performance monitoring."""
-        key = self._make_key(prompt, params)
-        start_time = time.time()
+        return self.get_by_key(self._make_key(prompt, params))
+    
+    def get_by_key(self, key: str) -> Optional[str]:
+        """Get cached response by a precomputed key, skipping hashing."""
+        start_ns = time.perf_counter_ns()
         
-        if key in self.cache:
-            entry = self.cache[key]
-            current_time = time.time()
+        entry = self.cache.get(key)
+        if entry is not None:
+            expires_at, response = entry
             
-            if current_time - entry['time'] < self.ttl:
+            if time.monotonic() < expires_at:
                 # Cache HIT
-                response_time = time.time() - start_time
+                response_time = (time.perf_counter_ns() - start_ns) * 1e-9
                 self.monitor.record_request(key, True, response_time, len(self.cache))
-                print(f"Cache HIT for key: {key[:8]}...")
-                return entry['response']
+                if self.verbose:
+                    print(f"Cache HIT for key: {key[:8]}...")
+                return response
             else:
                 # Cache EXPIRED
                 del self.cache[key]
         
         # Cache MISS
-        response_time = time.time() - start_time
+        response_time = (time.perf_counter_ns() - start_ns) * 1e-9
         self.monitor.record_request(key, False, response_time, len(self.cache))
-        print(f"Cache MISS for key: {key[:8]}...")
+        if self.verbose:
+            print(f"Cache MISS for key: {key[:8]}...")
         return None
     
     def set(self, prompt: str, params: Dict[str, Any], response: str) -> None:
         """Set cached response."""
-        key = self._make_key(prompt, params)
-        self.cache[key] = {
-            "response": response,
-            "time": time.time()
-        }
-        print(f"Cached response for key: {key[:8]}...")
+        self.set_by_key(self._make_key(prompt, params), response)
+    
+    def set_by_key(self, key: str, response: str) -> None:
+        """Set cached response under a precomputed key, skipping hashing."""
+        self.cache[key] = (time.monotonic() + self.ttl, response)
+        if self.verbose:
+            print(f"Cached response for key: {key[:8]}...")
     
     def get_stats(self):
         """Get comprehensive performance statistics."""
@@ -320,7 +391,7 @@ def demonstrate_performance_monitoring():
     print("=" * 60)
     
     # Initialize monitored cache
-    cache = MonitoredCache(ttl=30)
+    cache = MonitoredCache(ttl=30, verbose=True)
     test_params = {"model": "gpt-3.5-turbo", "temperature": 0.1}
     
     print("\n1. Testing with varied request patterns:")
@@ -345,21 +416,20 @@ def demonstrate_performance_monitoring():
     for i, prompt in enumerate(prompts, 1):
         print(f"\nRequest {i}: {prompt}")
         
-        cached_response = cache.get(prompt, test_params)
+        # Hash once and reuse the key for lookup, store and API-time recording
+        key = cache._make_key(prompt, test_params)
+        cached_response = cache.get_by_key(key)
         
         if cached_response is None:
             # Cache miss: Make API call
-            api_start = time.time()
+            api_start = time.perf_counter()
             response = mock_ai_api_call(prompt, test_params)
-            api_time = time.time() - api_start
+            api_time = time.perf_counter() - api_start
             
-            cache.set(prompt, test_params, response)
+            cache.set_by_key(key, response)
             
             # Record API call time
-            cache.monitor.record_request(
-                cache._make_key(prompt, test_params), 
-                False, 0, len(cache.cache), api_time
-            )
+            cache.monitor.record_request(key, False, 0, len(cache.cache), api_time)
             
             print(f"Response: {response}")
             print(f"API call time: {api_time:.2f}s")
@@ -413,18 +483,18 @@ def demonstrate_performance_monitoring():
     print("\n3. Performance Trends:")
     print("-" * 40)
     
-    # Show hit rate progression
+    # Show hit rate progression (history is sampled; the final value is live)
     hit_rate_history = cache.monitor.stats["hit_rate_history"]
-    if len(hit_rate_history) > 1:
-        initial_rate = hit_rate_history[0]["hit_rate"]
-        final_rate = hit_rate_history[-1]["hit_rate"]
+    if hit_rate_history:
+        initial_rate = hit_rate_history[0][1]
+        final_rate = basic["hit_rate"]
         print(f"Hit rate progression: {initial_rate:.1f}% → {final_rate:.1f}%")
     
     # Show cache size trends
     cache_size_history = cache.monitor.stats["cache_size_history"]
     if cache_size_history:
-        initial_size = cache_size_history[0]["size"]
-        final_size = cache_size_history[-1]["size"]
+        initial_size = cache_size_history[0][1]
+        final_size = len(cache.cache)
         print(f"Cache size progression: {initial_size} → {final_size} entries")
 
 def main():
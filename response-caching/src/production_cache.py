@@ -11,26 +11,167 @@ This exercise demonstrates:
 """
 
 import time
-import hashlib
-import json
+import zlib
 import threading
 import logging
-from typing import Dict, Any, Optional, List
-from collections import OrderedDict
+import weakref
+from array import array
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict, deque
 from enum import Enum
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Handlers and levels are left to the application (see main() for the demo)
 logger = logging.getLogger(__name__)
 
+# (prompt, frozen params): hashed and compared by the dict itself
+CacheKey = Tuple[str, Any]
+
+def _freeze(value: Any) -> Any:
+    """
+    Convert a parameter value into a hashable, order-independent form.
+    
+    Each value is tagged with its type so ``1``, ``1.0`` and ``True`` (equal
+    and same-hashing in Python) still produce distinct keys, as they did
+    when params were serialized to JSON. Dicts are sorted by key; lists and
+    tuples become tuples.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted((k, _freeze(v)) for k, v in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(_freeze(v) for v in value))
+    return (type(value), value)
+
+def _key_label(key: CacheKey) -> str:
+    """Short, stable-within-a-process identifier for a cache key in log lines."""
+    return f"{hash(key) & 0xffffffff:08x}"
+
+# TTL deadlines are integer time.monotonic_ns() readings: immune to wall-clock
+# jumps, and an int compare is cheaper than a float one
+_NS_PER_SECOND = 1_000_000_000
+
+def _start_sweeper(cache: Any, interval: float, stopped: threading.Event) -> None:
+    """
+    Call ``cache.cleanup_expired()`` every ``interval`` seconds on a daemon thread.
+    
+    The thread holds only a weak reference, so a cache dropped without
+    ``close()`` is still garbage collected and its sweeper exits at the next
+    wake-up. Setting ``stopped`` ends the thread immediately.
+    """
+    cache_ref = weakref.ref(cache)
+    
+    def sweep_loop():
+        while not stopped.wait(interval):
+            cache = cache_ref()
+            if cache is None:
+                return
+            cache.cleanup_expired()
+            del cache
+    
+    threading.Thread(target=sweep_loop, name="cache-sweeper", daemon=True).start()
+
 class CacheEvictionPolicy(Enum):
     """Cache eviction policies."""
     LRU = "lru"  # Least Recently Used
     LFU = "lfu"  # Least Frequently Used
     FIFO = "fifo"  # First In, First Out
+    TINYLFU = "tinylfu"  # LRU order, admission gated by access frequency
+    WEAK = "weak"  # LRU order, evicted entries live on while the app holds a get() result
+
+class FrequencySketch:
+    """
+    Approximate access counts for TinyLFU admission.
+    
+    A count-min sketch of ``depth`` rows of 4-bit counters, sixteen packed
+    into each 64-bit word of an ``array('Q')``. A key's estimate is the
+    minimum of its counters across rows. After ``10 * width`` increments
+    every counter is halved, so the sketch follows recent popularity rather
+    than all-time totals.
+    """
+    __slots__ = ('width', 'depth', '_mask', '_table', '_additions', '_sample_size')
+    
+    # Per-row seeds mixed into the key hash to pick independent counters
+    SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    
+    def __init__(self, width: int = 1024, depth: int = 4):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            width (int): Counters per row, rounded up to a power of two
+            depth (int): Number of rows, at most ``len(SEEDS)``
+        """
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.depth = min(depth, len(self.SEEDS))
+        self._mask = self.width - 1
+        self._table = array('Q', bytes(8 * self.width * self.depth // 16))
+        self._additions = 0
+        self._sample_size = 10 * self.width
+    
+    def _counters(self, key: Any):
+        """Yield the (word index, bit shift) of the key's counter in each row."""
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        for row in range(self.depth):
+            mixed = ((h ^ self.SEEDS[row]) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+            counter = row * self.width + ((mixed >> 32) & self._mask)
+            yield counter >> 4, (counter & 15) << 2
+    
+    def increment(self, key: Any) -> None:
+        """Count one access to ``key``; counters saturate at 15."""
+        table = self._table
+        added = False
+        for word, shift in self._counters(key):
+            if (table[word] >> shift) & 15 < 15:
+                table[word] += 1 << shift
+                added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self._sample_size:
+                self._reset()
+    
+    def estimate(self, key: Any) -> int:
+        """Return the approximate access count of ``key`` (0-15)."""
+        table = self._table
+        return min((table[word] >> shift) & 15 for word, shift in self._counters(key))
+    
+    def _reset(self) -> None:
+        """Halve every counter: shift each word right and clear the bit each nibble took from its neighbour."""
+        table = self._table
+        for i in range(len(table)):
+            table[i] = (table[i] >> 1) & 0x7777777777777777
+        self._additions //= 2
+
+class _WeakResponse(str):
+    """
+    A cached response that can be weakly referenced (a plain str can't).
+    
+    ``get`` hands this object out, so holding a ``get`` result is what keeps
+    an evicted WEAK entry alive; the str passed to ``set`` is not it.
+    """
+
+class _FrequencyNode:
+    """A bucket of keys sharing one access count in the LFU frequency list."""
+    __slots__ = ('freq', 'keys', 'prev', 'next')
+    
+    def __init__(self, freq: int):
+        self.freq = freq
+        # Insertion-ordered, so the oldest key at this frequency goes first
+        self.keys: Dict[CacheKey, None] = {}
+        self.prev = self
+        self.next = self
+
+class _Stats:
+    """Request counters; slotted attributes are cheaper to bump than dict items."""
+    __slots__ = ('hits', 'misses', 'evictions', 'rejections', 'errors',
+                 'total_requests', 'start_time')
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.errors = 0
+        self.total_requests = 0
+        self.start_time = time.time()
 
 class ProductionCache:
     """
@@ -43,12 +184,21 @@ class ProductionCache:
     - Error handling and recovery
     - Cache invalidation strategies
     - Performance monitoring
+    
+    Entries are stored as ``(expires_at_ns, response)`` tuples rather than
+    dicts: a tuple is a fraction of the size of a multi-key dict and
+    unpacking it avoids string-keyed lookups on every access.
     """
     
+    # Hits queued before a reader tries to apply them under the lock
+    ACCESS_BUFFER_SIZE = 64
+    
     def __init__(self, 
                  max_size: int = 1000,
                  ttl: int = 3600,
-                 eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU):
+                 eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+                 sweep_interval: float = 60.0,
+                 announce: bool = True):
         """
         Initialize the production cache.
         
@@ -56,89 +206,254 @@ class ProductionCache:
             max_size (int): Maximum number of cache entries
             ttl (int): Default time-to-live in seconds
             eviction_policy (CacheEvictionPolicy): Cache eviction strategy
+            sweep_interval (float): Seconds between background scans for
+                expired entries; 0 disables the sweeper thread
+            announce (bool): Log the configuration once created (shards of a
+                ShardedProductionCache don't)
         """
         self.max_size = max_size
         self.default_ttl = ttl
         self.eviction_policy = eviction_policy
         
-        # Thread safety
-        self._lock = threading.RLock()
+        # Expired entries are dropped individually when looked up; the O(n)
+        # scan for the rest runs on a background thread (started below), so
+        # neither get() nor set() pays for it
+        self.sweep_interval = sweep_interval
+        self._stopped = threading.Event()
+        
+        # Thread safety. Helpers named *_locked expect the caller to hold the
+        # lock, so nothing re-enters it and a plain Lock (cheaper to acquire
+        # than an RLock) is enough.
+        self._lock = threading.Lock()
+        
+        # Cache storage. Only LRU (and TinyLFU, which evicts in LRU order)
+        # reorders entries on a hit, which is what OrderedDict.move_to_end is
+        # for (faster than pop + reinsert on a dict). FIFO evicts in
+        # insertion order and LFU uses its own buckets, so they use a plain
+        # dict, which is smaller and also keeps order.
+        if eviction_policy in (CacheEvictionPolicy.LRU, CacheEvictionPolicy.TINYLFU,
+                               CacheEvictionPolicy.WEAK):
+            self._cache: Dict[CacheKey, Tuple[float, str]] = OrderedDict()
+        else:
+            self._cache = {}
+        
+        # LFU bookkeeping: a circular list of frequency buckets in ascending
+        # order behind a sentinel, plus key -> bucket. Hits move a key to the
+        # next bucket and eviction takes from the first one, both in O(1).
+        self._freq_head = _FrequencyNode(0)
+        self._key_freq: Dict[CacheKey, _FrequencyNode] = {}
+        
+        # Keys hit on the lock-free read path, waiting to be applied to the
+        # LRU order / LFU buckets and the hit counter. Every write drains it
+        # first, so writes and evictions see hits in the order they happened.
+        self._access_buffer: deque = deque()
+        
+        # TinyLFU: access frequencies of cached and recently missed keys.
+        # A new key is only admitted to a full cache if it has been asked
+        # for at least as often as the entry it would push out.
+        self._sketch: Optional[FrequencySketch] = None
+        if eviction_policy == CacheEvictionPolicy.TINYLFU:
+            self._sketch = FrequencySketch(width=max_size)
         
-        # Cache storage
-        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        # WEAK: the max_size most recently used entries are pinned in _cache;
+        # evicted ones move here and stay cached for as long as the
+        # application still holds the response object returned by get(),
+        # so the garbage collector rather than max_size decides when they
+        # go. Their deadlines live in _weak_expiry, keyed like _weak.
+        self._weak: Optional[weakref.WeakValueDictionary] = None
+        self._weak_expiry: Dict[CacheKey, int] = {}
+        if eviction_policy == CacheEvictionPolicy.WEAK:
+            self._weak = weakref.WeakValueDictionary()
         
         # Statistics
-        self.stats = {
-            "hits": 0,
-            "misses": 0,
-            "evictions": 0,
-            "errors": 0,
-            "total_requests": 0,
-            "start_time": time.time()
-        }
+        self.stats = _Stats()
+        
+        if sweep_interval > 0:
+            _start_sweeper(self, sweep_interval, self._stopped)
         
-        logger.info(f"Production cache initialized: max_size={max_size}, "
-                   f"policy={eviction_policy.value}")
+        if announce:
+            logger.info("Production cache initialized: max_size=%s, policy=%s",
+                        max_size, eviction_policy.value)
     
-    def _make_key(self, prompt: str, params: Dict[str, Any]) -> str:
-        """Generate a cache key."""
-        params_str = json.dumps(params, sort_keys=True)
-        raw_key = f"{prompt}_{params_str}"
-        return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+    def _make_key(self, prompt: str, params: Dict[str, Any]) -> CacheKey:
+        """
+        Generate a cache key.
+        
+        The key is the prompt plus the frozen params, used directly as the
+        dict key. Serializing to JSON and taking a SHA-256 digest bought
+        nothing for an in-process table, which hashes its keys anyway.
+        """
+        return (prompt, _freeze(params))
     
-    def _cleanup_expired(self):
-        """Remove expired entries from cache."""
-        with self._lock:
-            expired_keys = []
-            current_time = time.time()
-            
-            for key, entry in self._cache.items():
-                if current_time - entry['created_at'] > entry['ttl']:
-                    expired_keys.append(key)
+    def _cleanup_expired_locked(self) -> int:
+        """Remove expired entries from cache and return how many (caller holds the lock)."""
+        current_time = time.monotonic_ns()
+        # A comprehension skips the append() lookup and call per expired key
+        expired_keys = [key for key, (expires_at, _) in self._cache.items()
+                        if expires_at < current_time]
+        
+        for key in expired_keys:
+            self._remove_entry(key)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Removed expired entry: %s...", _key_label(key))
+        return len(expired_keys)
+    
+    def _enforce_size_limits_locked(self):
+        """Enforce cache size limits using eviction policy (caller holds the lock)."""
+        while len(self._cache) > self.max_size:
+            if len(self._cache) == 0:
+                break
             
-            for key in expired_keys:
-                del self._cache[key]
-                logger.debug(f"Removed expired entry: {key[:8]}...")
+            # Choose entry to evict based on policy
+            key_to_evict = self._select_eviction_candidate()
+            if key_to_evict:
+                if self._weak is not None:
+                    self._demote_locked(key_to_evict)
+                self._remove_entry(key_to_evict)
+                self.stats.evictions += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Evicted entry: %s...", _key_label(key_to_evict))
     
-    def _enforce_size_limits(self):
-        """Enforce cache size limits using eviction policy."""
-        with self._lock:
-            while len(self._cache) > self.max_size:
-                if len(self._cache) == 0:
-                    break
-                
-                # Choose entry to evict based on policy
-                key_to_evict = self._select_eviction_candidate()
-                if key_to_evict:
-                    del self._cache[key_to_evict]
-                    self.stats["evictions"] += 1
-                    logger.debug(f"Evicted entry: {key_to_evict[:8]}...")
-    
-    def _select_eviction_candidate(self) -> Optional[str]:
+    def _select_eviction_candidate(self) -> Optional[CacheKey]:
         """Select an entry to evict based on the eviction policy."""
         if not self._cache:
             return None
         
-        if self.eviction_policy == CacheEvictionPolicy.LRU:
+        if self.eviction_policy in (CacheEvictionPolicy.LRU, CacheEvictionPolicy.TINYLFU,
+                                    CacheEvictionPolicy.WEAK):
             # Remove least recently used (first in OrderedDict)
             return next(iter(self._cache))
         
         elif self.eviction_policy == CacheEvictionPolicy.LFU:
-            # Remove least frequently used
-            min_access_count = float('inf')
-            candidate = None
-            for key, entry in self._cache.items():
-                if entry['access_count'] < min_access_count:
-                    min_access_count = entry['access_count']
-                    candidate = key
-            return candidate
+            # Remove least frequently used: oldest key in the lowest bucket
+            return next(iter(self._freq_head.next.keys))
         
         elif self.eviction_policy == CacheEvictionPolicy.FIFO:
-            # Remove first in (same as LRU for OrderedDict)
+            # Remove first in (hits don't reorder a FIFO cache)
             return next(iter(self._cache))
         
         return next(iter(self._cache))  # Default to first
     
+    def _demote_locked(self, key: CacheKey) -> None:
+        """Move an evicted WEAK entry to the weak table (caller holds the lock)."""
+        expires_at, response = self._cache[key]
+        self._weak[key] = response
+        self._weak_expiry[key] = expires_at
+        if len(self._weak_expiry) > 2 * len(self._weak) + self.max_size:
+            # Drop deadlines of entries the garbage collector already took
+            self._weak_expiry = {k: self._weak_expiry[k] for k in self._weak.keys()
+                                 if k in self._weak_expiry}
+    
+    def _promote_locked(self, key: CacheKey) -> Optional[str]:
+        """
+        Move a live, unexpired entry back from the weak table (caller holds the lock).
+        
+        Returns:
+            Optional[str]: The response, or None if it was collected or expired
+        """
+        response = self._weak.pop(key, None)
+        expires_at = self._weak_expiry.pop(key, 0)
+        if response is None or time.monotonic_ns() > expires_at:
+            return None
+        self._cache[key] = (expires_at, response)
+        self._enforce_size_limits_locked()
+        return response
+    
+    def _admit_locked(self, key: CacheKey) -> bool:
+        """
+        Decide whether a new key may displace an entry (caller holds the lock).
+        
+        Only TinyLFU filters admissions: the newcomer must be at least as
+        frequent as the next eviction candidate, so a one-off request cannot
+        push out an entry that keeps being hit.
+        """
+        if self._sketch is None or key in self._cache:
+            return True
+        victim = self._select_eviction_candidate()
+        return victim is None or self._sketch.estimate(key) >= self._sketch.estimate(victim)
+    
+    def _record_hit(self, key: CacheKey) -> None:
+        """
+        Queue a hit from the lock-free read path.
+        
+        ``deque.append`` is atomic, so readers never wait for the lock. Once
+        ``ACCESS_BUFFER_SIZE`` hits are queued, a reader applies them if the
+        lock happens to be free; otherwise the next writer does.
+        """
+        self._access_buffer.append(key)
+        if len(self._access_buffer) >= self.ACCESS_BUFFER_SIZE and self._lock.acquire(blocking=False):
+            try:
+                self._drain_access_buffer_locked()
+            finally:
+                self._lock.release()
+    
+    def _drain_access_buffer_locked(self):
+        """Apply queued hits to the eviction order and stats (caller holds the lock)."""
+        buffer = self._access_buffer
+        while buffer:
+            key = buffer.popleft()
+            self.stats.hits += 1
+            # Skip keys evicted or invalidated since the hit
+            if key in self._cache:
+                self._apply_hit_locked(key)
+    
+    def _apply_hit_locked(self, key: CacheKey) -> None:
+        """Update the eviction order for a hit on ``key`` (caller holds the lock)."""
+        if self.eviction_policy in (CacheEvictionPolicy.LRU, CacheEvictionPolicy.WEAK):
+            self._cache.move_to_end(key)
+        elif self.eviction_policy == CacheEvictionPolicy.LFU:
+            self._track_hit(key)
+        elif self.eviction_policy == CacheEvictionPolicy.TINYLFU:
+            self._cache.move_to_end(key)
+            self._sketch.increment(key)
+    
+    def _remove_entry(self, key: CacheKey) -> None:
+        """Delete a cache entry and its LFU bookkeeping (caller holds the lock)."""
+        del self._cache[key]
+        self._untrack_key(key)
+    
+    def _untrack_key(self, key: CacheKey) -> None:
+        """Drop a key from its LFU bucket, if it is tracked."""
+        node = self._key_freq.pop(key, None)
+        if node is not None:
+            del node.keys[key]
+            if not node.keys:
+                self._unlink_freq_node(node)
+    
+    def _track_new_key(self, key: CacheKey) -> None:
+        """Place a newly stored key in the frequency-1 LFU bucket."""
+        node = self._freq_head.next
+        if node.freq != 1:
+            node = self._insert_freq_node(1, self._freq_head)
+        node.keys[key] = None
+        self._key_freq[key] = node
+    
+    def _track_hit(self, key: CacheKey) -> None:
+        """Move a key to the bucket one frequency higher, dropping emptied buckets."""
+        node = self._key_freq[key]
+        target = node.next
+        if target.freq != node.freq + 1:
+            target = self._insert_freq_node(node.freq + 1, node)
+        del node.keys[key]
+        target.keys[key] = None
+        self._key_freq[key] = target
+        if not node.keys:
+            self._unlink_freq_node(node)
+    
+    def _insert_freq_node(self, freq: int, after: _FrequencyNode) -> _FrequencyNode:
+        """Splice a new, empty frequency bucket in after ``after``."""
+        node = _FrequencyNode(freq)
+        node.prev = after
+        node.next = after.next
+        after.next.prev = node
+        after.next = node
+        return node
+    
+    def _unlink_freq_node(self, node: _FrequencyNode) -> None:
+        """Remove an empty frequency bucket from the list."""
+        node.prev.next = node.next
+        node.next.prev = node.prev
+    
     def get(self, prompt: str, params: Dict[str, Any]) -> Optional[str]:
         """
         Get a cached response with comprehensive error handling.
@@ -150,40 +465,74 @@ class ProductionCache:
         Returns:
             Optional[str]: Cached response or None if not found
         """
-        key = self._make_key(prompt, params)
-        self.stats["total_requests"] += 1
+        return self.get_with_key(self._make_key(prompt, params))
+    
+    def get_with_key(self, key: CacheKey) -> Optional[str]:
+        """
+        Get a cached response by a precomputed key, skipping key generation.
+        
+        A caller that misses and then stores the response can build the key
+        once and pass it to both this and ``set_with_key``.
+        
+        Args:
+            key (CacheKey): Cache key from ``_make_key``
+            
+        Returns:
+            Optional[str]: Cached response or None if not found
+        """
+        self.stats.total_requests += 1
         
         try:
+            # Fast path: a hit only reads the cache and queues the key for
+            # _drain_access_buffer_locked, so concurrent readers don't serialize
+            entry = self._cache.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if time.monotonic_ns() <= expires_at:
+                    self._record_hit(key)
+                    
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Cache HIT: %s...", _key_label(key))
+                    return response
+            
             with self._lock:
-                # Cleanup expired entries first
-                self._cleanup_expired()
-                
                 if key in self._cache:
-                    entry = self._cache[key]
-                    current_time = time.time()
+                    expires_at, response = self._cache[key]
                     
                     # Check if entry is still valid
-                    if current_time - entry['created_at'] <= entry['ttl']:
-                        # Cache HIT
-                        entry['access_count'] += 1
-                        entry['last_accessed'] = current_time
-                        self._cache.move_to_end(key)  # Move to end for LRU
-                        self.stats["hits"] += 1
+                    if time.monotonic_ns() <= expires_at:
+                        # Cache HIT (stored by another thread meanwhile)
+                        self._apply_hit_locked(key)
+                        self.stats.hits += 1
                         
-                        logger.debug(f"Cache HIT: {key[:8]}...")
-                        return entry['value']
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Cache HIT: %s...", _key_label(key))
+                        return response
                     else:
                         # Entry has expired
-                        del self._cache[key]
+                        self._remove_entry(key)
+                
+                elif self._weak is not None:
+                    response = self._promote_locked(key)
+                    if response is not None:
+                        # Cache HIT on an evicted entry the application kept alive
+                        self.stats.hits += 1
+                        
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Cache HIT (weak): %s...", _key_label(key))
+                        return response
                 
                 # Cache MISS
-                self.stats["misses"] += 1
-                logger.debug(f"Cache MISS: {key[:8]}...")
+                if self._sketch is not None:
+                    self._sketch.increment(key)
+                self.stats.misses += 1
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cache MISS: %s...", _key_label(key))
                 return None
                 
         except Exception as e:
-            logger.error(f"Error retrieving from cache: {e}")
-            self.stats["errors"] += 1
+            logger.error("Error retrieving from cache: %s", e)
+            self.stats.errors += 1
             return None
     
     def set(self, prompt: str, params: Dict[str, Any], response: str, 
@@ -191,6 +540,10 @@ class ProductionCache:
         """
         Set a cached response with error handling.
         
+        Under the WEAK policy the cache stores its own weakly referenceable
+        copy of ``response``; only the object a later ``get`` returns keeps
+        the entry alive after eviction, not the str passed in here.
+        
         Args:
             prompt (str): The AI prompt
             params (Dict[str, Any]): Model parameters
@@ -198,32 +551,56 @@ class ProductionCache:
             ttl (Optional[int]): Custom TTL for this entry
             
         Returns:
-            bool: True if successfully cached, False otherwise
+            bool: True if successfully cached, False otherwise (including an
+                  entry turned away by the TinyLFU admission filter)
         """
-        key = self._make_key(prompt, params)
+        return self.set_with_key(self._make_key(prompt, params), response, ttl)
+    
+    def set_with_key(self, key: CacheKey, response: str, ttl: Optional[int] = None) -> bool:
+        """
+        Store a response under a precomputed key, skipping key generation.
         
+        Args:
+            key (CacheKey): Cache key from ``_make_key``
+            response (str): The AI response
+            ttl (Optional[int]): Custom TTL for this entry
+            
+        Returns:
+            bool: True if successfully cached, False otherwise
+        """
         try:
             with self._lock:
+                self._drain_access_buffer_locked()
+                current_time = time.monotonic_ns()
+                if self._weak is not None:
+                    # A new value replaces any evicted one
+                    self._weak.pop(key, None)
+                    self._weak_expiry.pop(key, None)
+                    response = _WeakResponse(response)
+                
                 # Check if we need to evict entries
                 if len(self._cache) >= self.max_size:
-                    self._enforce_size_limits()
+                    if not self._admit_locked(key):
+                        self.stats.rejections += 1
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Rejected by admission filter: %s...", _key_label(key))
+                        return False
+                    self._enforce_size_limits_locked()
                 
-                # Add new entry
-                current_time = time.time()
-                self._cache[key] = {
-                    'value': response,
-                    'created_at': current_time,
-                    'last_accessed': current_time,
-                    'access_count': 1,
-                    'ttl': ttl or self.default_ttl
-                }
+                # Add new entry; an absolute deadline makes expiry checks one compare
+                self._cache[key] = (current_time + (ttl or self.default_ttl) * _NS_PER_SECOND, response)
+                if self.eviction_policy == CacheEvictionPolicy.LFU:
+                    # Overwriting an entry restarts its count at 1
+                    self._untrack_key(key)
+                    self._track_new_key(key)
                 
-                logger.debug(f"Cached response: {key[:8]}...")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Cached response: %s...", _key_label(key))
                 return True
                 
         except Exception as e:
-            logger.error(f"Error setting cache entry: {e}")
-            self.stats["errors"] += 1
+            logger.error("Error setting cache entry: %s", e)
+            self.stats.errors += 1
             return False
     
     def invalidate(self, prompt: str, params: Dict[str, Any]) -> bool:
@@ -237,19 +614,26 @@ class ProductionCache:
         Returns:
             bool: True if entry was invalidated, False if not found
         """
-        key = self._make_key(prompt, params)
-        
+        return self._invalidate_by_key(self._make_key(prompt, params))
+    
+    def _invalidate_by_key(self, key: CacheKey) -> bool:
+        """Remove the entry under a key from ``_make_key`` (see ``invalidate``)."""
         try:
             with self._lock:
-                if key in self._cache:
-                    del self._cache[key]
-                    logger.info(f"Invalidated cache entry: {key[:8]}...")
-                    return True
-                return False
+                self._drain_access_buffer_locked()
+                found = key in self._cache
+                if found:
+                    self._remove_entry(key)
+                if self._weak is not None and self._weak.pop(key, None) is not None:
+                    found = True
+                self._weak_expiry.pop(key, None)
+                if found:
+                    logger.info("Invalidated cache entry: %s...", _key_label(key))
+                return found
                 
         except Exception as e:
-            logger.error(f"Error invalidating cache entry: {e}")
-            self.stats["errors"] += 1
+            logger.error("Error invalidating cache entry: %s", e)
+            self.stats.errors += 1
             return False
     
     def clear(self) -> int:
@@ -260,34 +644,66 @@ class ProductionCache:
             int: Number of entries cleared
         """
         try:
-            with self._lock:
-                count = len(self._cache)
-                self._cache.clear()
-                logger.info(f"Cleared {count} cache entries")
-                return count
+            count = self._clear_entries()
+            logger.info("Cleared %s cache entries", count)
+            return count
                 
         except Exception as e:
-            logger.error(f"Error clearing cache: {e}")
-            self.stats["errors"] += 1
+            logger.error("Error clearing cache: %s", e)
+            self.stats.errors += 1
             return 0
     
+    def cleanup_expired(self) -> int:
+        """
+        Remove all expired entries now; the sweeper thread calls this.
+        
+        Returns:
+            int: Number of expired entries removed
+        """
+        try:
+            with self._lock:
+                return self._cleanup_expired_locked()
+        except Exception as e:
+            logger.error("Error cleaning up expired entries: %s", e)
+            self.stats.errors += 1
+            return 0
+    
+    def close(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stopped.set()
+    
+    def _clear_entries(self) -> int:
+        """Drop every entry and its eviction state; return how many there were."""
+        with self._lock:
+            self._drain_access_buffer_locked()
+            count = len(self._cache)
+            self._cache.clear()
+            self._freq_head = _FrequencyNode(0)
+            self._key_freq.clear()
+            if self._weak is not None:
+                self._weak.clear()
+            self._weak_expiry.clear()
+            return count
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics."""
         with self._lock:
-            total = self.stats["total_requests"]
-            hits = self.stats["hits"]
-            misses = self.stats["misses"]
+            self._drain_access_buffer_locked()
+            total = self.stats.total_requests
+            hits = self.stats.hits
+            misses = self.stats.misses
             
             hit_rate = (hits / total * 100) if total > 0 else 0
             
-            return {
+            report = {
                 "basic_stats": {
                     "total_requests": total,
                     "hits": hits,
                     "misses": misses,
                     "hit_rate": hit_rate,
-                    "evictions": self.stats["evictions"],
-                    "errors": self.stats["errors"]
+                    "evictions": self.stats.evictions,
+                    "rejections": self.stats.rejections,
+                    "errors": self.stats.errors
                 },
                 "cache_stats": {
                     "current_entries": len(self._cache),
@@ -298,12 +714,152 @@ class ProductionCache:
                     "eviction_policy": self.eviction_policy.value,
                     "default_ttl": self.default_ttl
                 },
-                "uptime": time.time() - self.stats["start_time"]
+                "uptime": time.time() - self.stats.start_time
             }
+            if self._weak is not None:
+                # Evicted entries still reachable through the application
+                report["cache_stats"]["weak_entries"] = len(self._weak)
+            return report
+
+class ShardedProductionCache:
+    """
+    A ProductionCache split into independently locked shards.
+    
+    Each key is routed by its hash to one of ``num_shards`` ProductionCache
+    instances, each with its own lock, storage, eviction state and
+    statistics, so threads working on different shards never contend.
+    Capacity is divided evenly and eviction runs per shard, which applies
+    the eviction policy approximately across the whole cache.
+    """
+    
+    # Same key as ProductionCache, computed once and used for routing too
+    _make_key = ProductionCache._make_key
+    
+    def __init__(self,
+                 max_size: int = 1000,
+                 ttl: int = 3600,
+                 eviction_policy: CacheEvictionPolicy = CacheEvictionPolicy.LRU,
+                 sweep_interval: float = 60.0,
+                 num_shards: int = 16):
+        """
+        Initialize the sharded cache.
+        
+        Args:
+            max_size (int): Maximum number of cache entries across all shards
+            ttl (int): Default time-to-live in seconds
+            eviction_policy (CacheEvictionPolicy): Cache eviction strategy
+            sweep_interval (float): Seconds between background scans of every
+                shard for expired entries; 0 disables the sweeper thread
+            num_shards (int): Number of independently locked shards
+        """
+        self.max_size = max_size
+        self.default_ttl = ttl
+        self.eviction_policy = eviction_policy
+        self.start_time = time.time()
+        
+        # Shards get no sweeper of their own; one thread sweeps them in turn
+        shard_size = max(1, max_size // num_shards)
+        self._shards = [
+            ProductionCache(shard_size, ttl, eviction_policy, 0, announce=False)
+            for _ in range(num_shards)
+        ]
+        self._stopped = threading.Event()
+        if sweep_interval > 0:
+            _start_sweeper(self, sweep_interval, self._stopped)
+        
+        logger.info("Sharded production cache initialized: max_size=%s, shards=%s, policy=%s",
+                    max_size, num_shards, eviction_policy.value)
+    
+    def _shard_for(self, key: CacheKey) -> ProductionCache:
+        """Return the shard responsible for a key."""
+        return self._shards[hash(key) % len(self._shards)]
+    
+    def get(self, prompt: str, params: Dict[str, Any]) -> Optional[str]:
+        """Get a cached response from the key's shard (see ProductionCache.get)."""
+        return self.get_with_key(self._make_key(prompt, params))
+    
+    def get_with_key(self, key: CacheKey) -> Optional[str]:
+        """Get a cached response by a precomputed key (see ProductionCache.get_with_key)."""
+        return self._shard_for(key).get_with_key(key)
+    
+    def set(self, prompt: str, params: Dict[str, Any], response: str,
+            ttl: Optional[int] = None) -> bool:
+        """Store a response in the key's shard (see ProductionCache.set)."""
+        return self.set_with_key(self._make_key(prompt, params), response, ttl)
+    
+    def set_with_key(self, key: CacheKey, response: str, ttl: Optional[int] = None) -> bool:
+        """Store a response under a precomputed key (see ProductionCache.set_with_key)."""
+        return self._shard_for(key).set_with_key(key, response, ttl)
+    
+    def invalidate(self, prompt: str, params: Dict[str, Any]) -> bool:
+        """Invalidate an entry in the key's shard (see ProductionCache.invalidate)."""
+        key = self._make_key(prompt, params)
+        return self._shard_for(key)._invalidate_by_key(key)
+    
+    def clear(self) -> int:
+        """
+        Clear all cache entries in every shard.
+        
+        Returns:
+            int: Number of entries cleared
+        """
+        count = 0
+        for shard in self._shards:
+            try:
+                count += shard._clear_entries()
+            except Exception as e:
+                logger.error("Error clearing cache: %s", e)
+                shard.stats.errors += 1
+        logger.info("Cleared %s cache entries", count)
+        return count
+    
+    def cleanup_expired(self) -> int:
+        """
+        Remove expired entries from every shard, locking one shard at a time.
+        
+        Returns:
+            int: Number of expired entries removed
+        """
+        return sum(shard.cleanup_expired() for shard in self._shards)
+    
+    def close(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stopped.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics summed over all shards."""
+        totals = {"total_requests": 0, "hits": 0, "misses": 0,
+                  "evictions": 0, "rejections": 0, "errors": 0}
+        entries = 0
+        capacity = 0
+        for shard in self._shards:
+            shard_stats = shard.get_stats()
+            for name in totals:
+                totals[name] += shard_stats["basic_stats"][name]
+            entries += shard_stats["cache_stats"]["current_entries"]
+            capacity += shard_stats["cache_stats"]["max_entries"]
+        
+        total = totals["total_requests"]
+        totals["hit_rate"] = (totals["hits"] / total * 100) if total > 0 else 0
+        
+        return {
+            "basic_stats": totals,
+            "cache_stats": {
+                "current_entries": entries,
+                "max_entries": capacity,
+                "usage_percent": (entries / capacity) * 100
+            },
+            "configuration": {
+                "eviction_policy": self.eviction_policy.value,
+                "default_ttl": self.default_ttl,
+                "shards": len(self._shards)
+            },
+            "uptime": time.time() - self.start_time
+        }
 
 def mock_ai_api_call(prompt: str, params: Dict[str, Any]) -> str:
     """Simulate an AI API call with artificial delay."""
-    delay = 1 + (hash(prompt) % 3)
+    delay = 1 + (zlib.crc32(prompt.encode('utf-8')) % 3)  # Deterministic across runs
     print(f"Making API call (simulated delay: {delay}s)...")
     time.sleep(delay)
     
@@ -379,12 +935,14 @@ def demonstrate_production_cache():
         for i, prompt in enumerate(prompts, 1):
             print(f"\nRequest {i}: {prompt}")
             
-            cached_response = cache.get(prompt, test_params)
+            # Build the key once for both the lookup and the store on a miss
+            key = cache._make_key(prompt, test_params)
+            cached_response = cache.get_with_key(key)
             
             if cached_response is None:
                 # Cache miss: Make API call
                 response = mock_ai_api_call(prompt, test_params)
-                success = cache.set(prompt, test_params, response)
+                success = cache.set_with_key(key, response)
                 
                 if success:
                     print(f"Response: {response}")
@@ -444,14 +1002,15 @@ def demonstrate_production_cache():
         # Clear cache
         cleared_count = cache.clear()
         print(f"\nCleared {cleared_count} cache entries")
+        cache.close()
         
         print(f"\n{config['name']} test completed.")
         print("=" * 60)
     
     print("\n4. Production Features Demonstrated:")
     print("-" * 40)
-    print("✓ Thread-safe operations with RLock")
-    print("✓ Multiple eviction policies (LRU, LFU, FIFO)")
+    print("✓ Thread-safe operations with Lock")
+    print("✓ Multiple eviction policies (LRU, LFU, FIFO, TinyLFU, Weak)")
     print("✓ Memory management and size limits")
     print("✓ Comprehensive error handling")
     print("✓ Cache invalidation strategies")
@@ -461,6 +1020,11 @@ def demonstrate_production_cache():
 
 def main():
     """Main function to run the production cache demonstration."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     try:
         demonstrate_production_cache()
         
@@ -476,7 +1040,7 @@ def main():
         print("- Graceful operations ensure data integrity")
         
     except Exception as e:
-        logger.error(f"Error running exercise: {e}")
+        logger.error("Error running exercise: %s", e)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
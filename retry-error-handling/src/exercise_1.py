@@ -1,19 +1,27 @@
 """
 Exercise 1: Basic Retry Mechanism
-Implement a simple retry mechanism with fixed delay for AI API calls.
+Implement a simple retry mechanism with backoff for AI API calls.
 
 This exercise demonstrates:
-1. Basic retry logic with fixed delays
-2. HTTP status code handling (5xx, 429)
+1. Basic retry logic with exponential backoff and jitter
+2. HTTP status code handling (5xx, 429, Retry-After)
 3. Network error handling
 4. Basic console logging
 """
 
+import asyncio
+import math
+import random
 import time
 import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any
 
+# Last whole second formatted by log_event and its timestamp string; lines
+# logged within the same second reuse it instead of calling strftime again
+_timestamp_cache = [0, ""]
+
 def log_event(message: str) -> None:
     """
     Log events with timestamp.
@@ -21,8 +29,14 @@ def log_event(message: str) -> None:
     Args:
         message (str): Message to log
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {message}")
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache[0] = now
+        _timestamp_cache[1] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+    print(f"[{_timestamp_cache[1]}] {message}")
+
+# Retry on server errors (5xx) and rate limits (429): one set lookup per response
+_RETRYABLE_STATUS_CODES = frozenset({429, *range(500, 600)})
 
 def is_retryable_error(status_code: int) -> bool:
     """
@@ -34,28 +48,83 @@ def is_retryable_error(status_code: int) -> bool:
     Returns:
         bool: True if error is retryable, False otherwise
     """
-    # Retry on server errors (5xx) and rate limits (429)
-    return status_code == 429 or (500 <= status_code < 600)
+    return status_code in _RETRYABLE_STATUS_CODES
 
-def call_api_with_retry(url: str, 
-                        max_retries: int = 3, 
-                        delay_seconds: int = 2,
-                        timeout: int = 10) -> Optional[Dict[str, Any]]:
+def backoff_delay(delay_seconds: float, attempt: int) -> float:
+    """
+    Calculate an exponential backoff delay with random jitter.
+    
+    The jitter keeps clients that failed together from retrying in
+    lockstep and hitting the server again all at once.
+    
+    Args:
+        delay_seconds (float): Base delay
+        attempt (int): Zero-based retry attempt
+        
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    return delay_seconds * (2 ** attempt) + random.uniform(0, delay_seconds)
+
+def retry_after_delay(response: requests.Response, default: float, max_delay: float = 60.0) -> float:
+    """
+    Read the delay requested by a Retry-After header.
+    
+    Both forms of the header are understood: a number of seconds, or an
+    HTTP date to wait until.
+    
+    Args:
+        response (requests.Response): Response that failed
+        default (float): Delay to use if the header is missing or invalid
+        max_delay (float): Maximum delay cap
+        
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    delay = default
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        if math.isnan(delay):
+            delay = default
+    
+    # Never wait past max_delay, and don't spin on a date already gone by
+    return min(max(delay, 0.1), max_delay)
+
+async def call_api_with_retry(url: str, 
+                              max_retries: int = 3, 
+                              delay_seconds: float = 2,
+                              timeout: int = 10,
+                              max_delay: float = 60.0) -> Optional[Dict[str, Any]]:
     """
     Call an API with basic retry mechanism.
     
     This function:
     1. Makes HTTP requests with timeout
     2. Retries on specific error types (5xx, 429)
-    3. Uses fixed delay between retries
+    3. Uses exponential backoff with jitter between retries, honouring
+       Retry-After on 429
     4. Logs all attempts and errors
     5. Returns response data or None on failure
     
+    Waiting and the blocking request itself run off the event loop, so
+    other coroutines keep going while this call retries.
+    
     Args:
         url (str): API endpoint URL
         max_retries (int): Maximum number of retry attempts
-        delay_seconds (int): Fixed delay between retries
+        delay_seconds (float): Base delay, doubled on each retry
         timeout (int): Request timeout in seconds
+        max_delay (float): Longest wait a Retry-After header can ask for
         
     Returns:
         Optional[Dict[str, Any]]: Response data or None if all retries failed
@@ -63,11 +132,12 @@ def call_api_with_retry(url: str,
     attempt = 0
     
     while attempt <= max_retries:
+        delay = backoff_delay(delay_seconds, attempt)
         try:
             log_event(f"Attempt {attempt + 1}/{max_retries + 1}: Making request to {url}")
             
-            # Make the HTTP request
-            response = requests.get(url, timeout=timeout)
+            # Make the HTTP request in a worker thread
+            response = await asyncio.to_thread(requests.get, url, timeout=timeout)
             
             # Check if response is successful
             if response.status_code == 200:
@@ -76,10 +146,12 @@ def call_api_with_retry(url: str,
             
             # Check if error is retryable
             if is_retryable_error(response.status_code):
-                log_event(f"RETRYABLE ERROR: HTTP {response.status_code} - Retrying in {delay_seconds}s...")
+                if response.status_code == 429:
+                    delay = retry_after_delay(response, delay, max_delay)
+                log_event(f"RETRYABLE ERROR: HTTP {response.status_code} - Retrying in {delay:.1f}s...")
                 
                 if attempt < max_retries:
-                    time.sleep(delay_seconds)
+                    await asyncio.sleep(delay)
                     attempt += 1
                     continue
                 else:
@@ -91,9 +163,9 @@ def call_api_with_retry(url: str,
                 return None
         
         except requests.exceptions.Timeout as e:
-            log_event(f"TIMEOUT ERROR: {e} - Retrying in {delay_seconds}s...")
+            log_event(f"TIMEOUT ERROR: {e} - Retrying in {delay:.1f}s...")
             if attempt < max_retries:
-                time.sleep(delay_seconds)
+                await asyncio.sleep(delay)
                 attempt += 1
                 continue
             else:
@@ -101,9 +173,9 @@ def call_api_with_retry(url: str,
                 return None
         
         except requests.exceptions.ConnectionError as e:
-            log_event(f"CONNECTION ERROR: {e} - Retrying in {delay_seconds}s...")
+            log_event(f"CONNECTION ERROR: {e} - Retrying in {delay:.1f}s...")
             if attempt < max_retries:
-                time.sleep(delay_seconds)
+                await asyncio.sleep(delay)
                 attempt += 1
                 continue
             else:
@@ -111,9 +183,9 @@ def call_api_with_retry(url: str,
                 return None
         
         except requests.exceptions.RequestException as e:
-            log_event(f"REQUEST ERROR: {e} - Retrying in {delay_seconds}s...")
+            log_event(f"REQUEST ERROR: {e} - Retrying in {delay:.1f}s...")
             if attempt < max_retries:
-                time.sleep(delay_seconds)
+                await asyncio.sleep(delay)
                 attempt += 1
                 continue
             else:
@@ -123,7 +195,7 @@ def call_api_with_retry(url: str,
     log_event("MAX RETRIES REACHED: Request failed.")
     return None
 
-def demonstrate_basic_retry():
+async def demonstrate_basic_retry():
     """
     Demonstrate the basic retry mechanism with different scenarios.
     """
@@ -162,7 +234,7 @@ def demonstrate_basic_retry():
         print(f"URL: {test_case['url']}")
         
         # Test with basic retry
-        result = call_api_with_retry(
+        result = await call_api_with_retry(
             url=test_case['url'],
             max_retries=3,
             delay_seconds=2
@@ -181,7 +253,8 @@ def demonstrate_basic_retry():
     print("EXERCISE 1 COMPLETED SUCCESSFULLY!")
     print("=" * 60)
     print("Key learnings:")
-    print("- Basic retry logic with fixed delays")
+    print("- Retry logic with exponential backoff and jitter")
+    print("- Honouring Retry-After on rate limits")
     print("- HTTP status code classification")
     print("- Network error handling")
     print("- Console logging for debugging")
@@ -190,7 +263,7 @@ def demonstrate_basic_retry():
 def main():
     """Main function to run the basic retry demonstration."""
     try:
-        demonstrate_basic_retry()
+        asyncio.run(demonstrate_basic_retry())
     except Exception as e:
         log_event(f"Error running exercise: {e}")
 
@@ -9,23 +9,49 @@ This exercise demonstrates:
 4. Configurable backoff parameters
 """
 
-import time
+import asyncio
+import math
 import random
+import logging
+import time
 import requests
-from datetime import datetime
-from typing import Optional, Dict, Any
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Tuple
+from urllib.parse import urlsplit
+from enum import Enum
 
-def log_event(message: str) -> None:
-    """
-    Log events with timestamp.
-    
-    Args:
-        message (str): Message to log
-    """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {message}")
+# Handlers and levels are left to the application (see main() for the demo).
+# Messages take %-style arguments, so they are only formatted when emitted.
+logger = logging.getLogger(__name__)
+
+# One pooled session for every call, so retries and repeated requests to the
+# same host reuse an open connection instead of a new TCP/TLS handshake.
+# Retrying is done here, not by urllib3, hence max_retries=0. Callers keep
+# at most _MAX_CONCURRENT_CALLS requests in flight, so the pool holds that
+# many connections per host and none are thrown away when calls finish.
+_MAX_CONCURRENT_CALLS = 16
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=_MAX_CONCURRENT_CALLS, max_retries=0)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+
+class BackoffStrategy(Enum):
+    """How the delay grows from one retry to the next."""
+    EXPONENTIAL = "exponential"  # base_delay * 2^attempt with ±25% jitter
+    DECORRELATED = "decorrelated"  # AWS decorrelated jitter: random in [base_delay, 3 * previous delay]
+    FIBONACCI = "fibonacci"  # base_delay * fib(attempt) with ±25% jitter: gentler growth, more retries per wait
 
-def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+# Fibonacci multipliers 1, 1, 2, 3, 5, ... up to the same attempt clamp (30)
+# as the exponential shift
+_FIBONACCI = [1, 1]
+while len(_FIBONACCI) <= 30:
+    _FIBONACCI.append(_FIBONACCI[-1] + _FIBONACCI[-2])
+
+def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0,
+                            strategy: BackoffStrategy = BackoffStrategy.EXPONENTIAL,
+                            prev_delay: Optional[float] = None) -> float:
     """
     Calculate exponential backoff delay with jitter.
     
@@ -35,26 +61,99 @@ def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: fl
     3. Adds jitter (±25% random variation)
     4. Ensures minimum delay of 0.1 seconds
     
+    The FIBONACCI strategy multiplies base_delay by fib(attempt) instead
+    of 2^attempt. With DECORRELATED the delay is instead drawn uniformly
+    from [base_delay, 3 * prev_delay], then capped the same way.
+    
     Args:
         attempt (int): Current attempt number (0-based)
         base_delay (float): Base delay in seconds
         max_delay (float): Maximum delay in seconds
+        strategy (BackoffStrategy): How delays grow between retries
+        prev_delay (Optional[float]): Previous delay (DECORRELATED only);
+            None on the first retry
         
     Returns:
         float: Calculated delay in seconds
     """
-    # Calculate exponential delay
-    exponential_delay = base_delay * (2 ** attempt)
+    if strategy == BackoffStrategy.DECORRELATED:
+        # Each delay is drawn relative to the previous one rather than to the
+        # attempt number, so clients that failed together drift apart
+        upper = (prev_delay or base_delay) * 3.0
+        delay = base_delay + random.random() * (upper - base_delay)
+        delay = max_delay if delay > max_delay else delay
+        return 0.1 if delay < 0.1 else delay
+    
+    # Calculate the growing delay; a shift is cheaper than int power, and
+    # clamping it keeps huge attempt numbers from building a bignum
+    if strategy == BackoffStrategy.FIBONACCI:
+        raw_delay = base_delay * _FIBONACCI[min(attempt, 30)]
+    else:
+        raw_delay = base_delay * (1 << min(attempt, 30))
     
     # Cap at maximum delay
-    capped_delay = min(exponential_delay, max_delay)
+    capped_delay = max_delay if raw_delay > max_delay else raw_delay
     
     # Add jitter (±25% random variation)
-    jitter_factor = random.uniform(0.75, 1.25)
-    final_delay = capped_delay * jitter_factor
+    final_delay = capped_delay * (0.75 + random.random() * 0.5)
     
     # Ensure minimum delay
-    return max(final_delay, 0.1)
+    return 0.1 if final_delay < 0.1 else final_delay
+
+def retry_after_delay(response: requests.Response, default: float, max_delay: float = 60.0) -> float:
+    """
+    Read the delay requested by a Retry-After header.
+    
+    Both forms of the header are understood: a number of seconds, or an
+    HTTP date to wait until.
+    
+    Args:
+        response (requests.Response): Response that failed
+        default (float): Delay to use if the header is missing or invalid
+        max_delay (float): Maximum delay cap
+        
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    delay = default
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        if math.isnan(delay):
+            delay = default
+    
+    # Never wait past max_delay, and don't spin on a date already gone by
+    return min(max(delay, 0.1), max_delay)
+
+# Retry on server errors (5xx) and rate limits (429): one set lookup per response
+_RETRYABLE_STATUS_CODES = frozenset({429, *range(500, 600)})
+
+# Unused error bodies up to this size are read off the socket so the
+# connection can go back to the pool; bigger ones aren't worth downloading
+_MAX_DRAIN_BYTES = 64 * 1024
+
+def discard_body(response: requests.Response) -> None:
+    """
+    Release a streamed response whose body won't be used.
+    
+    Args:
+        response (requests.Response): Response requested with stream=True
+    """
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) <= _MAX_DRAIN_BYTES:
+        response.raw.drain_conn()
+    else:
+        # Closing drops the connection instead of downloading the body
+        response.close()
 
 def is_retryable_error(status_code: int) -> bool:
     """
@@ -66,23 +165,87 @@ def is_retryable_error(status_code: int) -> bool:
     Returns:
         bool: True if error is retryable, False otherwise
     """
-    # Retry on server errors (5xx) and rate limits (429)
-    return status_code == 429 or (500 <= status_code < 600)
+    return status_code in _RETRYABLE_STATUS_CODES
+
+# Log label per exception class, seeded with what requests actually raises;
+# other classes are added by exception_label() the first time they are seen
+_EXC_LABELS = {
+    requests.exceptions.ConnectTimeout: "TIMEOUT",
+    requests.exceptions.ReadTimeout: "TIMEOUT",
+    requests.exceptions.Timeout: "TIMEOUT",
+    requests.exceptions.ConnectionError: "CONNECTION",
+}
 
-def call_api_with_exponential_backoff(url: str, 
-                                    max_retries: int = 3,
-                                    base_delay: float = 1.0,
-                                    max_delay: float = 60.0,
-                                    timeout: int = 10) -> Optional[Dict[str, Any]]:
+def exception_label(error: requests.exceptions.RequestException) -> str:
+    """
+    Label a transport error for the logs and remember it for its class.
+    
+    Args:
+        error (requests.exceptions.RequestException): Error raised by requests
+        
+    Returns:
+        str: "TIMEOUT", "CONNECTION" or "REQUEST"
+    """
+    if isinstance(error, requests.exceptions.Timeout):
+        label = "TIMEOUT"
+    elif isinstance(error, requests.exceptions.ConnectionError):
+        label = "CONNECTION"
+    else:
+        label = "REQUEST"
+    _EXC_LABELS[type(error)] = label
+    return label
+
+# Circuit breaker: after this many consecutive server-side failures (5xx,
+# timeouts, connection errors) an endpoint is skipped, with no request and no
+# backoff sleep, until the cooldown has passed. Endpoints are keyed by
+# scheme://host/path rather than host, so one failing path doesn't shut out
+# the rest of the server; callers can pass their own key instead.
+_CIRCUIT_FAIL_THRESHOLD = 5
+_CIRCUIT_COOLDOWN = 30.0
+_CIRCUIT: Dict[str, Tuple[int, float]] = {}  # key -> (failures, open until)
+
+def _circuit_key(url: str) -> str:
+    """Default breaker key for url: scheme, host and path, without the query."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+def _circuit_open(key: str) -> bool:
+    """Whether requests under key are currently being skipped."""
+    state = _CIRCUIT.get(key)
+    return (state is not None and state[0] >= _CIRCUIT_FAIL_THRESHOLD
+            and time.monotonic() < state[1])
+
+def _circuit_record(key: str, ok: bool) -> None:
+    """Reset key's failure count on success, or count one more failure."""
+    if ok:
+        _CIRCUIT.pop(key, None)
+    else:
+        now = time.monotonic()
+        failures, _ = _CIRCUIT.get(key, (0, 0.0))
+        # Forget endpoints whose cooldown ran out without another failure, so
+        # the table doesn't grow with every URL that ever failed once
+        for stale in [k for k, (_, until) in _CIRCUIT.items() if until <= now]:
+            del _CIRCUIT[stale]
+        _CIRCUIT[key] = (failures + 1, now + _CIRCUIT_COOLDOWN)
+
+async def call_api_with_exponential_backoff(url: str, 
+                                          max_retries: int = 3,
+                                          base_delay: float = 1.0,
+                                          max_delay: float = 60.0,
+                                          timeout: int = 10,
+                                          backoff_strategy: BackoffStrategy = BackoffStrategy.EXPONENTIAL,
+                                          session: Optional[requests.Session] = None,
+                                          circuit_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Call an API with exponential backoff and jitter.
     
     This function:
     1. Makes HTTP requests with timeout
     2. Retries on specific error types (5xx, 429)
-    3. Uses exponential backoff with jitter
-    4. Logs all attempts and delays
-    5. Returns response data or None on failure
+    3. Uses exponential backoff with jitter (or Retry-After on 429)
+    4. Skips endpoints whose circuit breaker is open
+    5. Logs all attempts and delays
+    6. Returns response data or None on failure
     
     Args:
         url (str): API endpoint URL
@@ -90,79 +253,84 @@ def call_api_with_exponential_backoff(url: str,
         base_delay (float): Base delay for exponential backoff
         max_delay (float): Maximum delay cap
         timeout (int): Request timeout in seconds
+        backoff_strategy (BackoffStrategy): How delays grow between retries
+        session (Optional[requests.Session]): Session to send requests with;
+            defaults to the shared module session
+        circuit_key (Optional[str]): Circuit breaker to count failures under;
+            defaults to the URL's scheme, host and path
         
     Returns:
         Optional[Dict[str, Any]]: Response data or None if all retries failed
     """
+    session = session or _SESSION
+    key = circuit_key or _circuit_key(url)
     attempt = 0
+    delay = None
     
     while attempt <= max_retries:
+        if _circuit_open(key):
+            logger.info("CIRCUIT OPEN: %s keeps failing - Skipping request", key)
+            return None
+        
         try:
-            log_event(f"Attempt {attempt + 1}/{max_retries + 1}: Making request to {url}")
+            logger.info("Attempt %d/%d: Making request to %s", attempt + 1, max_retries + 1, url)
             
-            # Make the HTTP request
-            response = requests.get(url, timeout=timeout)
+            # Make the HTTP request in a worker thread, keeping the event loop
+            # free; stream=True holds the body back until we know we want it
+            response = await asyncio.to_thread(session.get, url, timeout=timeout, stream=True)
             
             # Check if response is successful
             if response.status_code == 200:
-                log_event(f"SUCCESS: Request completed successfully")
-                return response.json()
+                _circuit_record(key, True)
+                logger.info("SUCCESS: Request completed successfully")
+                return await asyncio.to_thread(response.json)
+            
+            # Only the status and headers of a failure are used; draining
+            # reads from the socket, so keep it off the event loop too
+            await asyncio.to_thread(discard_body, response)
+            if response.status_code >= 500:
+                _circuit_record(key, False)
             
             # Check if error is retryable
             if is_retryable_error(response.status_code):
                 if attempt < max_retries:
-                    # Calculate backoff delay
-                    delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                    log_event(f"RETRYABLE ERROR: HTTP {response.status_code} - Retrying in {delay:.2f}s (attempt {attempt + 1})")
+                    # Calculate backoff delay, deferring to the server's
+                    # Retry-After on rate limits
+                    delay = calculate_backoff_delay(attempt, base_delay, max_delay, backoff_strategy, delay)
+                    if response.status_code == 429:
+                        delay = retry_after_delay(response, delay, max_delay)
+                    logger.info("RETRYABLE ERROR: HTTP %d - Retrying in %.2fs (attempt %d)",
+                                response.status_code, delay, attempt + 1)
                     
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
                     attempt += 1
                     continue
                 else:
-                    log_event(f"MAX RETRIES REACHED: HTTP {response.status_code} after {max_retries + 1} attempts")
+                    logger.info("MAX RETRIES REACHED: HTTP %d after %d attempts",
+                                response.status_code, max_retries + 1)
                     return None
             else:
                 # Non-retryable error (4xx except 429)
-                log_event(f"NON-RETRYABLE ERROR: HTTP {response.status_code} - Stopping retries")
-                return None
-        
-        except requests.exceptions.Timeout as e:
-            if attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"TIMEOUT ERROR: {e} - Retrying in {delay:.2f}s (attempt {attempt + 1})")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event(f"MAX RETRIES REACHED: Timeout after {max_retries + 1} attempts")
-                return None
-        
-        except requests.exceptions.ConnectionError as e:
-            if attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"CONNECTION ERROR: {e} - Retrying in {delay:.2f}s (attempt {attempt + 1})")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event(f"MAX RETRIES REACHED: Connection error after {max_retries + 1} attempts")
+                logger.info("NON-RETRYABLE ERROR: HTTP %d - Stopping retries", response.status_code)
                 return None
         
         except requests.exceptions.RequestException as e:
-            if attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"REQUEST ERROR: {e} - Retrying in {delay:.2f}s (attempt {attempt + 1})")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event(f"MAX RETRIES REACHED: Request error after {max_retries + 1} attempts")
+            # One handler for every transport error; only the label differs
+            label = _EXC_LABELS.get(type(e)) or exception_label(e)
+            _circuit_record(key, False)
+            if attempt >= max_retries:
+                logger.info("MAX RETRIES REACHED: %s ERROR after %d attempts", label, max_retries + 1)
                 return None
+            
+            delay = calculate_backoff_delay(attempt, base_delay, max_delay, backoff_strategy, delay)
+            logger.info("%s ERROR: %s - Retrying in %.2fs (attempt %d)", label, e, delay, attempt + 1)
+            await asyncio.sleep(delay)
+            attempt += 1
     
-    log_event("MAX RETRIES REACHED: Request failed.")
+    logger.info("MAX RETRIES REACHED: Request failed.")
     return None
 
-def demonstrate_exponential_backoff():
+async def demonstrate_exponential_backoff():
     """
     Demonstrate exponential backoff with different scenarios.
     """
@@ -189,6 +357,20 @@ def demonstrate_exponential_backoff():
             "base_delay": 2.0,
             "max_delay": 60.0,
             "description": "Conservative approach for sensitive APIs"
+        },
+        {
+            "name": "Decorrelated Jitter (Base: 1s, Max: 30s)",
+            "base_delay": 1.0,
+            "max_delay": 30.0,
+            "backoff_strategy": BackoffStrategy.DECORRELATED,
+            "description": "Each delay drawn from up to 3x the previous one"
+        },
+        {
+            "name": "Fibonacci Backoff (Base: 1s, Max: 30s)",
+            "base_delay": 1.0,
+            "max_delay": 30.0,
+            "backoff_strategy": BackoffStrategy.FIBONACCI,
+            "description": "Gentler growth: 1s, 1s, 2s, 3s, 5s..."
         }
     ]
     
@@ -198,6 +380,30 @@ def demonstrate_exponential_backoff():
         "https://httpbin.org/json"
     ]
     
+    # More calls than pooled connections would open (and then discard) extra ones
+    limit = asyncio.Semaphore(_MAX_CONCURRENT_CALLS)
+    
+    async def bounded(**kwargs):
+        async with limit:
+            return await call_api_with_exponential_backoff(**kwargs)
+    
+    # Every config/URL run is independent, so start them all at once; the
+    # demo then takes as long as the slowest run, not the sum of all of them
+    print(f"\nRunning {len(test_configs) * len(test_urls)} tests concurrently...")
+    results = iter(await asyncio.gather(
+        *(bounded(
+            url=url,
+            max_retries=3,
+            base_delay=config['base_delay'],
+            max_delay=config['max_delay'],
+            backoff_strategy=config.get('backoff_strategy', BackoffStrategy.EXPONENTIAL),
+            # Runs share endpoints; a breaker each keeps one run's failures
+            # from cutting short another's backoff
+            circuit_key=f"{config['name']}:{url}"
+        ) for config in test_configs for url in test_urls),
+        return_exceptions=True
+    ))
+    
     for i, config in enumerate(test_configs, 1):
         print(f"\n{i}. {config['name']}")
         print("-" * 40)
@@ -205,18 +411,14 @@ def demonstrate_exponential_backoff():
         print(f"Base Delay: {config['base_delay']}s")
         print(f"Max Delay: {config['max_delay']}s")
         
-        # Test with different URLs
+        # Results of the different URLs
         for j, url in enumerate(test_urls, 1):
             print(f"\n  Test {j}: {url}")
             
-            result = call_api_with_exponential_backoff(
-                url=url,
-                max_retries=3,
-                base_delay=config['base_delay'],
-                max_delay=config['max_delay']
-            )
-            
-            if result is not None:
+            result = next(results)
+            if isinstance(result, Exception):
+                print(f"  ❌ ERROR: {result}")
+            elif result is not None:
                 print(f"  ✅ SUCCESS: Received response")
                 if isinstance(result, dict):
                     print(f"  Response keys: {list(result.keys())}")
@@ -234,6 +436,7 @@ def demonstrate_exponential_backoff():
     print("- Configurable parameters for different use cases")
     print("- Enhanced logging shows delay calculations")
     print("- Different backoff strategies for different scenarios")
+    print("- Concurrent retries overlap their backoff waits")
 
 def demonstrate_backoff_calculation():
     """
@@ -254,23 +457,25 @@ def demonstrate_backoff_calculation():
     print("Attempt | Exponential | Capped | With Jitter")
     print("--------|-------------|--------|------------")
     
+    rand = random.random
     for attempt in range(6):
-        exponential = base_delay * (2 ** attempt)
-        capped = min(exponential, max_delay)
+        exponential = base_delay * (1 << attempt)
+        capped = max_delay if exponential > max_delay else exponential
         
         # Calculate jitter for demonstration
-        jitter_factor = random.uniform(0.75, 1.25)
-        with_jitter = capped * jitter_factor
+        with_jitter = capped * (0.75 + rand() * 0.5)
         
         print(f"{attempt:7d} | {exponential:11.1f} | {capped:6.1f} | {with_jitter:10.2f}")
 
 def main():
     """Main function to run the exponential backoff demonstration."""
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S")
     try:
-        demonstrate_exponential_backoff()
+        asyncio.run(demonstrate_exponential_backoff())
         demonstrate_backoff_calculation()
     except Exception as e:
-        log_event(f"Error running exercise: {e}")
+        logger.error("Error running exercise: %s", e)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
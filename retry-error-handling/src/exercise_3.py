@@ -10,13 +10,34 @@ This exercise demonstrates:
 5. Custom error types and handling
 """
 
-import time
+import asyncio
+import math
 import random
+import logging
+import time
 import requests
+from requests.adapters import HTTPAdapter
 import json
-from datetime import datetime
-from typing import Optional, Dict, Any, Union, List
-from enum import Enum
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Union, List, Tuple
+from enum import Enum, IntEnum
+from urllib.parse import urlsplit
+
+# Handlers and levels are left to the application (see main() for the demo).
+# Messages take %-style arguments, so they are only formatted when emitted.
+logger = logging.getLogger(__name__)
+
+# One pooled session for every call, so retries and repeated requests to the
+# same host reuse an open connection instead of a new TCP/TLS handshake.
+# Retrying is done here, not by urllib3, hence max_retries=0. Callers keep
+# at most _MAX_CONCURRENT_CALLS requests in flight, so the pool holds that
+# many connections per host and none are thrown away when calls finish.
+_MAX_CONCURRENT_CALLS = 16
+_SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(pool_connections=10, pool_maxsize=_MAX_CONCURRENT_CALLS, max_retries=0)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
 
 class ErrorType(Enum):
     """Types of errors that can occur in API calls."""
@@ -29,23 +50,49 @@ class ErrorType(Enum):
     VALIDATION = "validation"
     UNKNOWN = "unknown"
 
-class ErrorStrategy(Enum):
-    """Strategies for handling different error types."""
-    RETRY = "retry"
-    FAIL_FAST = "fail_fast"
-    FALLBACK = "fallback"
-    DEGRADE = "degrade"
-
-def log_event(message: str, level: str = "INFO") -> None:
-    """
-    Log events with timestamp and level.
+class ErrorStrategy(IntEnum):
+    """Strategies for handling different error types.
     
-    Args:
-        message (str): Message to log
-        level (str): Log level (INFO, WARNING, ERROR)
+    Values are indexes into the handler table used by
+    call_api_with_advanced_error_handling.
     """
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] {message}")
+    RETRY = 0
+    FAIL_FAST = 1
+    FALLBACK = 2
+    DEGRADE = 3
+    
+    def __init__(self, value: int):
+        # Lower-case name shown in logs, e.g. "fail_fast"; a plain attribute
+        # so reading it doesn't go through the enum's property machinery
+        self.label = self.name.lower()
+
+# Log text per error type, built once instead of on every failed attempt
+_ERROR_LABELS = {error_type: error_type.value for error_type in ErrorType}
+_ERROR_HEADINGS = {error_type: f"{error_type.value.upper()} ERROR" for error_type in ErrorType}
+
+class BackoffStrategy(Enum):
+    """How the delay grows from one retry to the next."""
+    EXPONENTIAL = "exponential"  # base_delay * 2^attempt with ±25% jitter
+    DECORRELATED = "decorrelated"  # AWS decorrelated jitter: random in [base_delay, 3 * previous delay]
+    FIBONACCI = "fibonacci"  # base_delay * fib(attempt) with ±25% jitter: gentler growth, more retries per wait
+
+# Fibonacci multipliers 1, 1, 2, 3, 5, ... up to the same attempt clamp (30)
+# as the exponential shift
+_FIBONACCI = [1, 1]
+while len(_FIBONACCI) <= 30:
+    _FIBONACCI.append(_FIBONACCI[-1] + _FIBONACCI[-2])
+
+# Built once at import; get_error_strategy runs on every failed attempt
+_STRATEGY_MAP = {
+    ErrorType.NETWORK: ErrorStrategy.RETRY,
+    ErrorType.TIMEOUT: ErrorStrategy.RETRY,
+    ErrorType.RATE_LIMIT: ErrorStrategy.RETRY,
+    ErrorType.SERVER_ERROR: ErrorStrategy.RETRY,
+    ErrorType.AUTHENTICATION: ErrorStrategy.FAIL_FAST,
+    ErrorType.CLIENT_ERROR: ErrorStrategy.FAIL_FAST,
+    ErrorType.VALIDATION: ErrorStrategy.FAIL_FAST,
+    ErrorType.UNKNOWN: ErrorStrategy.FAIL_FAST
+}
 
 def classify_error(status_code: Optional[int], exception: Optional[Exception] = None) -> ErrorType:
     """
@@ -93,48 +140,77 @@ def get_error_strategy(error_type: ErrorType) -> ErrorStrategy:
     Returns:
         ErrorStrategy: Strategy to use for this error
     """
-    strategy_map = {
-        ErrorType.NETWORK: ErrorStrategy.RETRY,
-        ErrorType.TIMEOUT: ErrorStrategy.RETRY,
-        ErrorType.RATE_LIMIT: ErrorStrategy.RETRY,
-        ErrorType.SERVER_ERROR: ErrorStrategy.RETRY,
-        ErrorType.AUTHENTICATION: ErrorStrategy.FAIL_FAST,
-        ErrorType.CLIENT_ERROR: ErrorStrategy.FAIL_FAST,
-        ErrorType.VALIDATION: ErrorStrategy.FAIL_FAST,
-        ErrorType.UNKNOWN: ErrorStrategy.FAIL_FAST
-    }
-    
-    return strategy_map.get(error_type, ErrorStrategy.FAIL_FAST)
+    return _STRATEGY_MAP.get(error_type, ErrorStrategy.FAIL_FAST)
 
-def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
-    """Calculate exponential backoff delay with jitter."""
-    exponential_delay = base_delay * (2 ** attempt)
-    capped_delay = min(exponential_delay, max_delay)
-    jitter_factor = random.uniform(0.75, 1.25)
-    final_delay = capped_delay * jitter_factor
-    return max(final_delay, 0.1)
+def calculate_backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0,
+                            strategy: BackoffStrategy = BackoffStrategy.EXPONENTIAL,
+                            prev_delay: Optional[float] = None) -> float:
+    """Calculate a backoff delay with jitter (see BackoffStrategy)."""
+    if strategy == BackoffStrategy.DECORRELATED:
+        upper = (prev_delay or base_delay) * 3.0
+        delay = base_delay + random.random() * (upper - base_delay)
+        delay = max_delay if delay > max_delay else delay
+        return 0.1 if delay < 0.1 else delay
+    
+    if strategy == BackoffStrategy.FIBONACCI:
+        raw_delay = base_delay * _FIBONACCI[min(attempt, 30)]
+    else:
+        raw_delay = base_delay * (1 << min(attempt, 30))
+    capped_delay = max_delay if raw_delay > max_delay else raw_delay
+    final_delay = capped_delay * (0.75 + random.random() * 0.5)
+    return 0.1 if final_delay < 0.1 else final_delay
 
-def handle_rate_limit(response: requests.Response) -> float:
+def retry_after_delay(response: requests.Response, default: float, max_delay: float = 60.0) -> float:
     """
-    Handle rate limit by extracting retry-after header.
+    Read the delay requested by a Retry-After header.
+    
+    Both forms of the header are understood: a number of seconds, or an
+    HTTP date to wait until.
     
     Args:
-        response (requests.Response): HTTP response with rate limit
+        response (requests.Response): Response that failed
+        default (float): Delay to use if the header is missing or invalid
+        max_delay (float): Maximum delay cap
         
     Returns:
-        float: Delay to wait before retry
+        float: Seconds to wait before the next attempt
     """
-    retry_after = response.headers.get('Retry-After')
+    delay = default
+    retry_after = response.headers.get("Retry-After")
     if retry_after:
         try:
-            return float(retry_after)
+            delay = float(retry_after)
         except ValueError:
-            pass
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        if math.isnan(delay):
+            delay = default
     
-    # Default delay for rate limits
-    return 60.0
+    # Never wait past max_delay, and don't spin on a date already gone by
+    return min(max(delay, 0.1), max_delay)
 
-def validate_response(response: requests.Response) -> bool:
+def handle_rate_limit(response: requests.Response,
+                      default_delay: float = 60.0,
+                      max_delay: float = 60.0) -> float:
+    """
+    Handle rate limit by extracting retry-after header.
+    
+    Args:
+        response (requests.Response): HTTP response with rate limit
+        default_delay (float): Delay to use if the header is missing or invalid
+        max_delay (float): Maximum delay cap
+        
+    Returns:
+        float: Delay to wait before retry
+    """
+    return retry_after_delay(response, default_delay, max_delay)
+
+def validate_response(response: requests.Response) -> Tuple[bool, Optional[Any]]:
     """
     Validate response for common issues.
     
@@ -142,32 +218,157 @@ def validate_response(response: requests.Response) -> bool:
         response (requests.Response): HTTP response
         
     Returns:
-        bool: True if response is valid, False otherwise
+        Tuple[bool, Optional[Any]]: Whether the response is valid, and the
+            JSON body parsed while checking it (None if not JSON), so the
+            caller doesn't parse it a second time
     """
     try:
         # Check if response is JSON
+        parsed = None
         if 'application/json' in response.headers.get('Content-Type', ''):
-            response.json()
+            parsed = response.json()
         
         # Check for empty response
         if not response.content:
-            log_event("Empty response received", "WARNING")
-            return False
+            logger.warning("Empty response received")
+            return False, None
         
-        return True
+        return True, parsed
     except json.JSONDecodeError:
-        log_event("Invalid JSON response", "ERROR")
-        return False
+        logger.error("Invalid JSON response")
+        return False, None
     except Exception as e:
-        log_event(f"Response validation error: {e}", "ERROR")
+        logger.error("Response validation error: %s", e)
+        return False, None
+
+# Unused error bodies up to this size are read off the socket so the
+# connection can go back to the pool; bigger ones aren't worth downloading
+_MAX_DRAIN_BYTES = 64 * 1024
+
+def discard_body(response: requests.Response) -> None:
+    """
+    Release a streamed response whose body won't be used.
+    
+    Args:
+        response (requests.Response): Response requested with stream=True
+    """
+    length = response.headers.get('Content-Length', '')
+    if length.isdigit() and int(length) <= _MAX_DRAIN_BYTES:
+        response.raw.drain_conn()
+    else:
+        # Closing drops the connection instead of downloading the body
+        response.close()
+
+class _CallState:
+    """Per-call bookkeeping shared by the strategy handlers."""
+    __slots__ = ('max_retries', 'base_delay', 'max_delay', 'backoff_strategy',
+                 'attempt', 'delay', 'response', 'error', 'error_type')
+    
+    def __init__(self, max_retries: int, base_delay: float, max_delay: float,
+                 backoff_strategy: BackoffStrategy):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.backoff_strategy = backoff_strategy
+        self.attempt = 0
+        self.delay = None
+        # The failed attempt: an HTTP response, or the transport error
+        # that prevented one
+        self.response = None
+        self.error = None
+        self.error_type = None
+    
+    def describe(self) -> str:
+        """Short description of the failed attempt for log lines."""
+        if self.response is not None:
+            return f"HTTP {self.response.status_code}"
+        return f"{_ERROR_LABELS[self.error_type]} error"
+
+def _handle_retry(state: _CallState) -> bool:
+    """Set state.delay for another attempt, or give up once retries are used up."""
+    if state.attempt >= state.max_retries:
+        logger.error("MAX RETRIES REACHED: %s after %d attempts",
+                     state.describe(), state.max_retries + 1)
         return False
+    
+    # Handle rate limits specially
+    if state.error_type == ErrorType.RATE_LIMIT:
+        state.delay = handle_rate_limit(state.response, max_delay=state.max_delay)
+        logger.warning("RATE LIMIT: Waiting %.2fs before retry", state.delay)
+    else:
+        state.delay = calculate_backoff_delay(state.attempt, state.base_delay, state.max_delay,
+                                              state.backoff_strategy, state.delay)
+        logger.info("RETRYABLE ERROR: %s - Retrying in %.2fs", state.describe(), state.delay)
+    return True
+
+def _handle_fail_fast(state: _CallState) -> bool:
+    """Stop without retrying."""
+    logger.error("FAIL-FAST ERROR: %s - Stopping immediately", state.describe())
+    return False
+
+def _handle_fallback(state: _CallState) -> bool:
+    """Stop and let the caller's fallback data answer."""
+    logger.warning("FALLBACK: %s - Not retrying", state.describe())
+    return False
+
+def _handle_degrade(state: _CallState) -> bool:
+    """No dedicated handling for this error type yet."""
+    logger.error("Unknown strategy for error type: %s", _ERROR_LABELS[state.error_type])
+    return False
+
+# Indexed by ErrorStrategy; a handler returns True to retry after state.delay
+_HANDLERS = [
+    _handle_retry,      # RETRY
+    _handle_fail_fast,  # FAIL_FAST
+    _handle_fallback,   # FALLBACK
+    _handle_degrade,    # DEGRADE
+]
+
+# Circuit breaker: after this many consecutive server-side failures (5xx,
+# timeouts, connection errors) an endpoint is skipped, with no request and no
+# backoff sleep, until the cooldown has passed. Endpoints are keyed by
+# scheme://host/path rather than host, so one failing path doesn't shut out
+# the rest of the server; callers can pass their own key instead.
+_CIRCUIT_FAIL_THRESHOLD = 5
+_CIRCUIT_COOLDOWN = 30.0
+_CIRCUIT: Dict[str, Tuple[int, float]] = {}  # key -> (failures, open until)
+
+# Error types that count as server-side failures for the breaker
+_CIRCUIT_FAILURES = frozenset({ErrorType.SERVER_ERROR, ErrorType.NETWORK, ErrorType.TIMEOUT})
+
+def _circuit_key(url: str) -> str:
+    """Default breaker key for url: scheme, host and path, without the query."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
 
-def call_api_with_advanced_error_handling(url: str,
-                                        max_retries: int = 3,
-                                        base_delay: float = 1.0,
-                                        max_delay: float = 60.0,
-                                        timeout: int = 10,
-                                        fallback_data: Optional[Dict[str, Any]] = None) -> Union[Dict[str, Any], None]:
+def _circuit_open(key: str) -> bool:
+    """Whether requests under key are currently being skipped."""
+    state = _CIRCUIT.get(key)
+    return (state is not None and state[0] >= _CIRCUIT_FAIL_THRESHOLD
+            and time.monotonic() < state[1])
+
+def _circuit_record(key: str, ok: bool) -> None:
+    """Reset key's failure count on success, or count one more failure."""
+    if ok:
+        _CIRCUIT.pop(key, None)
+    else:
+        now = time.monotonic()
+        failures, _ = _CIRCUIT.get(key, (0, 0.0))
+        # Forget endpoints whose cooldown ran out without another failure, so
+        # the table doesn't grow with every URL that ever failed once
+        for stale in [k for k, (_, until) in _CIRCUIT.items() if until <= now]:
+            del _CIRCUIT[stale]
+        _CIRCUIT[key] = (failures + 1, now + _CIRCUIT_COOLDOWN)
+
+async def call_api_with_advanced_error_handling(url: str,
+                                              max_retries: int = 3,
+                                              base_delay: float = 1.0,
+                                              max_delay: float = 60.0,
+                                              timeout: int = 10,
+                                              fallback_data: Optional[Dict[str, Any]] = None,
+                                              backoff_strategy: BackoffStrategy = BackoffStrategy.EXPONENTIAL,
+                                              session: Optional[requests.Session] = None,
+                                              circuit_key: Optional[str] = None) -> Union[Dict[str, Any], None]:
     """
     Call an API with advanced error handling and multiple strategies.
     
@@ -177,6 +378,7 @@ def call_api_with_advanced_error_handling(url: str,
     3. Implements graceful degradation with fallbacks
     4. Handles rate limits with proper delays
     5. Validates responses for common issues
+    6. Skips endpoints whose circuit breaker is open
     
     Args:
         url (str): API endpoint URL
@@ -184,123 +386,83 @@ def call_api_with_advanced_error_handling(url: str,
         base_delay (float): Base delay for exponential backoff
         max_delay (float): Maximum delay cap
         timeout (int): Request timeout in seconds
-        fallback_data (Optional[Dict[str, Any]]): Fallback data if all retries fail
+        fallback_data (Optional[Dict[str, Any]]): Returned when the request fails for good
+        backoff_strategy (BackoffStrategy): How delays grow between retries
+        session (Optional[requests.Session]): Session to send requests with;
+            defaults to the shared module session
+        circuit_key (Optional[str]): Circuit breaker to count failures under;
+            defaults to the URL's scheme, host and path
         
     Returns:
         Union[Dict[str, Any], None]: Response data, fallback data, or None
     """
-    attempt = 0
+    session = session or _SESSION
+    state = _CallState(max_retries, base_delay, max_delay, backoff_strategy)
+    key = circuit_key or _circuit_key(url)
     
-    while attempt <= max_retries:
+    while True:
+        if _circuit_open(key):
+            logger.warning("CIRCUIT OPEN: %s keeps failing - Skipping request", key)
+            break
+        
         try:
-            log_event(f"Attempt {attempt + 1}/{max_retries + 1}: Making request to {url}")
-            
-            # Make the HTTP request
-            response = requests.get(url, timeout=timeout)
+            logger.info("Attempt %d/%d: Making request to %s", state.attempt + 1, max_retries + 1, url)
             
-            # Validate response
-            if not validate_response(response):
-                log_event("Response validation failed", "ERROR")
-                return None
+            # Make the HTTP request in a worker thread, keeping the event loop
+            # free; stream=True holds the body back until we know we want it
+            response = await asyncio.to_thread(session.get, url, timeout=timeout, stream=True)
             
             # Check if response is successful
             if response.status_code == 200:
-                log_event("SUCCESS: Request completed successfully")
-                return response.json()
+                _circuit_record(key, True)
+                # Validate response (this reads the body)
+                valid, data = await asyncio.to_thread(validate_response, response)
+                if not valid:
+                    logger.error("Response validation failed")
+                    return None
+                
+                logger.info("SUCCESS: Request completed successfully")
+                return data if data is not None else response.json()
             
-            # Classify the error
-            error_type = classify_error(response.status_code)
-            strategy = get_error_strategy(error_type)
+            # Only the status and headers of a failure are used; draining
+            # reads from the socket, so keep it off the event loop too
+            await asyncio.to_thread(discard_body, response)
             
-            log_event(f"Error classified as: {error_type.value} (Strategy: {strategy.value})", "INFO")
-            
-            # Apply appropriate strategy
-            if strategy == ErrorStrategy.RETRY:
-                if attempt < max_retries:
-                    # Handle rate limits specially
-                    if error_type == ErrorType.RATE_LIMIT:
-                        delay = handle_rate_limit(response)
-                        log_event(f"RATE LIMIT: Waiting {delay}s before retry", "WARNING")
-                    else:
-                        delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                        log_event(f"RETRYABLE ERROR: HTTP {response.status_code} - Retrying in {delay:.2f}s", "INFO")
-                    
-                    time.sleep(delay)
-                    attempt += 1
-                    continue
-                else:
-                    log_event(f"MAX RETRIES REACHED: HTTP {response.status_code} after {max_retries + 1} attempts", "ERROR")
-                    break
-            
-            elif strategy == ErrorStrategy.FAIL_FAST:
-                log_event(f"FAIL-FAST ERROR: HTTP {response.status_code} - Stopping immediately", "ERROR")
-                return None
-            
-            elif strategy == ErrorStrategy.FALLBACK:
-                log_event("Using fallback data due to error", "WARNING")
-                return fallback_data
-            
-            else:
-                log_event(f"Unknown strategy for error type: {error_type.value}", "ERROR")
-                return None
+            state.response, state.error = response, None
+            state.error_type = classify_error(response.status_code)
         
-        except requests.exceptions.Timeout as e:
-            error_type = ErrorType.TIMEOUT
-            strategy = get_error_strategy(error_type)
-            
-            log_event(f"TIMEOUT ERROR: {e} (Strategy: {strategy.value})", "WARNING")
-            
-            if strategy == ErrorStrategy.RETRY and attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"Retrying timeout error in {delay:.2f}s", "INFO")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event("Max retries reached for timeout", "ERROR")
-                break
+        except requests.exceptions.RequestException as e:
+            # Timeouts, connection and other transport errors share one
+            # path; classify_error tells them apart
+            state.response, state.error = None, e
+            state.error_type = classify_error(None, e)
         
-        except requests.exceptions.ConnectionError as e:
-            error_type = ErrorType.NETWORK
-            strategy = get_error_strategy(error_type)
-            
-            log_event(f"CONNECTION ERROR: {e} (Strategy: {strategy.value})", "WARNING")
-            
-            if strategy == ErrorStrategy.RETRY and attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"Retrying connection error in {delay:.2f}s", "INFO")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event("Max retries reached for connection error", "ERROR")
-                break
+        # Both kinds of failure are handled the same way from here
+        if state.error_type in _CIRCUIT_FAILURES:
+            _circuit_record(key, False)
+        strategy = get_error_strategy(state.error_type)
+        if state.error is None:
+            logger.info("Error classified as: %s (Strategy: %s)",
+                        _ERROR_LABELS[state.error_type], strategy.label)
+        else:
+            logger.log(logging.WARNING if strategy == ErrorStrategy.RETRY else logging.ERROR,
+                       "%s: %s (Strategy: %s)",
+                       _ERROR_HEADINGS[state.error_type], state.error, strategy.label)
         
-        except requests.exceptions.RequestException as e:
-            error_type = ErrorType.UNKNOWN
-            strategy = get_error_strategy(error_type)
-            
-            log_event(f"REQUEST ERROR: {e} (Strategy: {strategy.value})", "ERROR")
-            
-            if strategy == ErrorStrategy.RETRY and attempt < max_retries:
-                delay = calculate_backoff_delay(attempt, base_delay, max_delay)
-                log_event(f"Retrying request error in {delay:.2f}s", "INFO")
-                time.sleep(delay)
-                attempt += 1
-                continue
-            else:
-                log_event("Max retries reached for request error", "ERROR")
-                break
+        if not _HANDLERS[strategy](state):
+            break
+        await asyncio.sleep(state.delay)
+        state.attempt += 1
     
-    # If we get here, all retries failed
+    # Every failure that isn't retried ends here
     if fallback_data is not None:
-        log_event("Using fallback data after all retries failed", "WARNING")
+        logger.warning("Using fallback data")
         return fallback_data
     
-    log_event("All retries failed and no fallback available", "ERROR")
+    logger.error("Request failed and no fallback available")
     return None
 
-def demonstrate_advanced_error_handling():
+async def demonstrate_advanced_error_handling():
     """
     Demonstrate advanced error handling with different scenarios.
     """
@@ -348,7 +510,30 @@ def demonstrate_advanced_error_handling():
         }
     ]
     
-    for i, test_case in enumerate(test_cases, 1):
+    # More calls than pooled connections would open (and then discard) extra ones
+    limit = asyncio.Semaphore(_MAX_CONCURRENT_CALLS)
+    
+    async def bounded(**kwargs):
+        async with limit:
+            return await call_api_with_advanced_error_handling(**kwargs)
+    
+    # Run all test cases concurrently, then report them in order
+    print(f"\nRunning {len(test_cases)} test cases concurrently...")
+    results = await asyncio.gather(
+        *(bounded(
+            url=test_case['url'],
+            max_retries=3,
+            base_delay=1.0,
+            max_delay=30.0,
+            fallback_data=test_case['fallback'],
+            # Cases share endpoints; a breaker each keeps one case's failures
+            # from cutting short another's retries
+            circuit_key=f"{test_case['name']}:{test_case['url']}"
+        ) for test_case in test_cases),
+        return_exceptions=True
+    )
+    
+    for i, (test_case, result) in enumerate(zip(test_cases, results), 1):
         print(f"\n{i}. {test_case['name']}")
         print("-" * 40)
         print(f"Description: {test_case['description']}")
@@ -356,16 +541,9 @@ def demonstrate_advanced_error_handling():
         if test_case['fallback']:
             print(f"Fallback: {test_case['fallback']}")
         
-        # Test with advanced error handling
-        result = call_api_with_advanced_error_handling(
-            url=test_case['url'],
-            max_retries=3,
-            base_delay=1.0,
-            max_delay=30.0,
-            fallback_data=test_case['fallback']
-        )
-        
-        if result is not None:
+        if isinstance(result, Exception):
+            print(f"❌ ERROR: {result}")
+        elif result is not None:
             print(f"✅ SUCCESS: Received response")
             if isinstance(result, dict):
                 print(f"Response keys: {list(result.keys())}")
@@ -416,15 +594,17 @@ def demonstrate_error_classification():
         status_str = str(scenario["status_code"]) if scenario["status_code"] else "None"
         exception_str = scenario["exception"].__class__.__name__ if scenario["exception"] else "None"
         
-        print(f"{status_str:11} | {exception_str:9} | {error_type.value:10} | {strategy.value}")
+        print(f"{status_str:11} | {exception_str:9} | {error_type.value:10} | {strategy.label}")
 
 def main():
     """Main function to run the advanced error handling demonstration."""
+    logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s",
+                        datefmt="%Y-%m-%d %H:%M:%S")
     try:
-        demonstrate_advanced_error_handling()
+        asyncio.run(demonstrate_advanced_error_handling())
         demonstrate_error_classification()
     except Exception as e:
-        log_event(f"Error running exercise: {e}", "ERROR")
+        logger.error("Error running exercise: %s", e)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
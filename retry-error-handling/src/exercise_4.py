@@ -10,38 +10,106 @@ This exercise demonstrates:
 5. Production-ready error handling
 """
 
+import asyncio
+import math
 import time
 import random
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import atexit
+import queue
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional, Dict, Any, Union
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Configuration, read and parsed once at import rather than per wrapper
+MAX_RETRIES = int(os.getenv('MAX_RETRIES', 3))
+BASE_DELAY = float(os.getenv('BASE_DELAY', 1.0))
+MAX_DELAY = float(os.getenv('MAX_DELAY', 60.0))
+TIMEOUT = int(os.getenv('TIMEOUT', 30))
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+JITTER_SEED = os.getenv('JITTER_SEED')  # Set to make backoff jitter repeatable
+
 # Configure logging
 def setup_logging(log_file: str = "retry_errors.log"):
     """
     Setup file-based logging system.
     
+    Records are queued and written to the file and console by a background
+    thread, so logging never blocks a request on disk or terminal I/O.
+    Calling it again is a no-op once the queue handler is installed.
+    
     Args:
         log_file (str): Path to log file
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()  # Also log to console
-        ]
-    )
+    root = logging.getLogger()
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return logging.getLogger(__name__)
+    
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [
+        logging.FileHandler(log_file, delay=True),  # Opened on the first record
+        logging.StreamHandler()  # Also log to console
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.Queue()
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    # Stopping the listener flushes whatever is still queued
+    atexit.register(listener.stop)
+    
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
     return logging.getLogger(__name__)
 
-logger = setup_logging()
+logger = logging.getLogger(__name__)
+
+def retry_after_delay(response: requests.Response, default: float, max_delay: float = 60.0) -> float:
+    """
+    Read the delay requested by a Retry-After header.
+    
+    Both forms of the header are understood: a number of seconds, or an
+    HTTP date to wait until.
+    
+    Args:
+        response (requests.Response): Response that failed
+        default (float): Delay to use if the header is missing or invalid
+        max_delay (float): Maximum delay cap
+        
+    Returns:
+        float: Seconds to wait before the next attempt
+    """
+    delay = default
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                if retry_at.tzinfo is None:
+                    retry_at = retry_at.replace(tzinfo=timezone.utc)
+                delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+        if math.isnan(delay):
+            delay = default
+    
+    # Never wait past max_delay, and don't spin on a date already gone by
+    return min(max(delay, 0.1), max_delay)
+
+_NS_PER_SECOND = 1_000_000_000
 
 class ProductionRetryWrapper:
     """
@@ -57,33 +125,56 @@ class ProductionRetryWrapper:
     
     def __init__(self):
         """Initialize the production retry wrapper."""
-        # Load configuration from environment
-        self.max_retries = int(os.getenv('MAX_RETRIES', 3))
-        self.base_delay = float(os.getenv('BASE_DELAY', 1.0))
-        self.max_delay = float(os.getenv('MAX_DELAY', 60.0))
-        self.timeout = int(os.getenv('TIMEOUT', 30))
+        # Configuration loaded from the environment at import
+        self.max_retries = MAX_RETRIES
+        self.base_delay = BASE_DELAY
+        self.max_delay = MAX_DELAY
+        self.timeout = TIMEOUT
+        
+        # Own random generator for jitter; seeded from JITTER_SEED if set,
+        # otherwise from OS entropy
+        self._rng = random.Random(JITTER_SEED)
         
         # API configuration
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.openrouter_api_key = os.getenv('OPENROUTER_API_KEY')
+        self.openai_api_key = OPENAI_API_KEY
+        self.openrouter_api_key = OPENROUTER_API_KEY
         
-        # Metrics
-        self.metrics = {
-            "total_requests": 0,
-            "successful_requests": 0,
-            "failed_requests": 0,
-            "retry_attempts": 0,
-            "total_response_time": 0.0
+        # Request headers never change between calls, so build them once
+        self._openai_headers = {
+            "Authorization": f"Bearer {self.openai_api_key}",
+            "Content-Type": "application/json"
         }
+        self._openrouter_headers = {
+            "Authorization": f"Bearer {self.openrouter_api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/your-repo",
+            "X-Title": "Retry Error Handling Exercise"
+        }
+        
+        # One pooled session for every call, so retries and consecutive calls
+        # to the same API reuse an open connection instead of a new TCP/TLS
+        # handshake. Retrying is done here, not by urllib3, hence max_retries=0.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
-        logger.info(f"Production retry wrapper initialized with max_retries={self.max_retries}, "
-                   f"base_delay={self.base_delay}s, max_delay={self.max_delay}s")
+        # Metrics, as plain attributes rather than dict entries since they are
+        # bumped on every request. Only the event loop thread updates them.
+        self.total_requests = 0
+        self.successful_requests = 0
+        self.failed_requests = 0
+        self.retry_attempts = 0
+        self.total_response_ns = 0  # Integer nanoseconds, so sums don't drift
+        
+        logger.info("Production retry wrapper initialized with max_retries=%d, "
+                    "base_delay=%ss, max_delay=%ss", self.max_retries, self.base_delay, self.max_delay)
     
     def calculate_backoff_delay(self, attempt: int) -> float:
         """Calculate exponential backoff delay with jitter."""
         exponential_delay = self.base_delay * (2 ** attempt)
         capped_delay = min(exponential_delay, self.max_delay)
-        jitter_factor = random.uniform(0.75, 1.25)
+        jitter_factor = 0.75 + self._rng.random() * 0.5
         final_delay = capped_delay * jitter_factor
         return max(final_delay, 0.1)
     
@@ -91,7 +182,7 @@ class ProductionRetryWrapper:
         """Determine if an HTTP status code should trigger a retry."""
         return status_code == 429 or (500 <= status_code < 600)
     
-    def call_openai_api(self, prompt: str, model: str = "gpt-3.5-turbo") -> Optional[Dict[str, Any]]:
+    async def call_openai_api(self, prompt: str, model: str = "gpt-3.5-turbo") -> Optional[Dict[str, Any]]:
         """
         Call OpenAI API with retry mechanism.
         
@@ -107,19 +198,15 @@ class ProductionRetryWrapper:
             return None
         
         url = "https://api.openai.com/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.openai_api_key}",
-            "Content-Type": "application/json"
-        }
         data = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 150
         }
         
-        return self._make_request_with_retry(url, headers=headers, json=data)
+        return await self._make_request_with_retry(url, headers=self._openai_headers, json=data)
     
-    def call_openrouter_api(self, prompt: str, model: str = "openai/gpt-3.5-turbo") -> Optional[Dict[str, Any]]:
+    async def call_openrouter_api(self, prompt: str, model: str = "openai/gpt-3.5-turbo") -> Optional[Dict[str, Any]]:
         """
         Call OpenRouter API with retry mechanism.
         
@@ -135,21 +222,15 @@ class ProductionRetryWrapper:
             return None
         
         url = "https://openrouter.ai/api/v1/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.openrouter_api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://github.com/your-repo",
-            "X-Title": "Retry Error Handling Exercise"
-        }
         data = {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
             "max_tokens": 150
         }
         
-        return self._make_request_with_retry(url, headers=headers, json=data)
+        return await self._make_request_with_retry(url, headers=self._openrouter_headers, json=data)
     
-    def call_mock_api(self, url: str) -> Optional[Dict[str, Any]]:
+    async def call_mock_api(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Call a mock API for testing purposes.
         
@@ -159,115 +240,111 @@ class ProductionRetryWrapper:
         Returns:
             Optional[Dict[str, Any]]: API response or None
         """
-        return self._make_request_with_retry(url)
+        return await self._make_request_with_retry(url)
     
-    def _make_request_with_retry(self, url: str, **kwargs) -> Optional[Dict[str, Any]]:
+    async def _handle_retryable(self, attempt: int, reason: str, delay: Optional[float] = None) -> bool:
+        """
+        Wait before the next attempt, or report that retries are used up.
+        
+        Args:
+            attempt (int): Zero-based number of the attempt that failed
+            reason (str): What went wrong, for the logs
+            delay (Optional[float]): Wait to use instead of the backoff delay
+            
+        Returns:
+            bool: True if the request should be retried
+        """
+        if attempt >= self.max_retries:
+            logger.error("MAX RETRIES REACHED: %s after %d attempts", reason, self.max_retries + 1)
+            return False
+        
+        if delay is None:
+            delay = self.calculate_backoff_delay(attempt)
+        self.retry_attempts += 1
+        
+        logger.warning("RETRYABLE ERROR: %s - Retrying in %.2fs", reason, delay)
+        await asyncio.sleep(delay)
+        return True
+    
+    async def _make_request_with_retry(self, url: str, **kwargs) -> Optional[Dict[str, Any]]:
         """
         Make an HTTP request with comprehensive retry logic.
         
         Args:
             url (str): URL to request
-            **kwargs: Additional arguments for requests.post
+            **kwargs: Additional arguments for Session.post
             
         Returns:
             Optional[Dict[str, Any]]: Response data or None
         """
         attempt = 0
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()  # Monotonic, unlike wall-clock time
         
-        self.metrics["total_requests"] += 1
+        self.total_requests += 1
         
-        while attempt <= self.max_retries:
+        while True:
             try:
-                logger.info(f"Attempt {attempt + 1}/{self.max_retries + 1}: Making request to {url}")
+                logger.info("Attempt %d/%d: Making request to %s", attempt + 1, self.max_retries + 1, url)
                 
-                # Make the HTTP request
-                response = requests.post(url, timeout=self.timeout, **kwargs)
+                # Make the HTTP request in a worker thread so other calls can
+                # run on the event loop meanwhile
+                response = await asyncio.to_thread(self.session.post, url, timeout=self.timeout, **kwargs)
                 
                 # Check if response is successful
                 if response.status_code == 200:
-                    response_time = time.time() - start_time
-                    self.metrics["successful_requests"] += 1
-                    self.metrics["total_response_time"] += response_time
+                    response_ns = time.perf_counter_ns() - start_ns
+                    self.successful_requests += 1
+                    self.total_response_ns += response_ns
                     
-                    logger.info(f"SUCCESS: Request completed in {response_time:.2f}s")
+                    logger.info("SUCCESS: Request completed in %.2fs", response_ns / _NS_PER_SECOND)
                     return response.json()
                 
                 # Check if error is retryable
-                if self.is_retryable_error(response.status_code):
-                    if attempt < self.max_retries:
-                        delay = self.calculate_backoff_delay(attempt)
-                        self.metrics["retry_attempts"] += 1
-                        
-                        logger.warning(f"RETRYABLE ERROR: HTTP {response.status_code} - Retrying in {delay:.2f}s")
-                        time.sleep(delay)
-                        attempt += 1
-                        continue
-                    else:
-                        logger.error(f"MAX RETRIES REACHED: HTTP {response.status_code} after {self.max_retries + 1} attempts")
-                        break
-                else:
-                    # Non-retryable error
-                    logger.error(f"NON-RETRYABLE ERROR: HTTP {response.status_code} - Stopping retries")
-                    break
-            
-            except requests.exceptions.Timeout as e:
-                if attempt < self.max_retries:
-                    delay = self.calculate_backoff_delay(attempt)
-                    self.metrics["retry_attempts"] += 1
-                    
-                    logger.warning(f"TIMEOUT ERROR: {e} - Retrying in {delay:.2f}s")
-                    time.sleep(delay)
-                    attempt += 1
-                    continue
-                else:
-                    logger.error("MAX RETRIES REACHED: Timeout after all attempts")
+                if not self.is_retryable_error(response.status_code):
+                    logger.error("NON-RETRYABLE ERROR: HTTP %d - Stopping retries", response.status_code)
                     break
-            
-            except requests.exceptions.ConnectionError as e:
-                if attempt < self.max_retries:
-                    delay = self.calculate_backoff_delay(attempt)
-                    self.metrics["retry_attempts"] += 1
-                    
-                    logger.warning(f"CONNECTION ERROR: {e} - Retrying in {delay:.2f}s")
-                    time.sleep(delay)
-                    attempt += 1
-                    continue
-                else:
-                    logger.error("MAX RETRIES REACHED: Connection error after all attempts")
+                
+                delay = None
+                if response.status_code == 429:
+                    # The server knows best when it will take requests again
+                    delay = retry_after_delay(response, self.calculate_backoff_delay(attempt),
+                                              self.max_delay)
+                if not await self._handle_retryable(attempt, f"HTTP {response.status_code}", delay):
                     break
             
             except requests.exceptions.RequestException as e:
-                if attempt < self.max_retries:
-                    delay = self.calculate_backoff_delay(attempt)
-                    self.metrics["retry_attempts"] += 1
-                    
-                    logger.warning(f"REQUEST ERROR: {e} - Retrying in {delay:.2f}s")
-                    time.sleep(delay)
-                    attempt += 1
-                    continue
-                else:
-                    logger.error("MAX RETRIES REACHED: Request error after all attempts")
+                # Timeouts, connection and other transport errors all retry
+                # the same way; only the description differs
+                kind = ("Timeout" if isinstance(e, requests.exceptions.Timeout)
+                        else "Connection error" if isinstance(e, requests.exceptions.ConnectionError)
+                        else "Request error")
+                if not await self._handle_retryable(attempt, f"{kind} ({e})"):
                     break
+            
+            attempt += 1
         
         # If we get here, all retries failed
-        self.metrics["failed_requests"] += 1
+        self.failed_requests += 1
         logger.error("All retries failed")
         return None
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get current metrics."""
-        total_requests = self.metrics["total_requests"]
-        success_rate = (self.metrics["successful_requests"] / total_requests * 100) if total_requests > 0 else 0
-        avg_response_time = (self.metrics["total_response_time"] / self.metrics["successful_requests"]) if self.metrics["successful_requests"] > 0 else 0
+        total_requests = self.total_requests
+        successful_requests = self.successful_requests
+        total_response_time = self.total_response_ns / _NS_PER_SECOND
         
         return {
-            **self.metrics,
-            "success_rate": success_rate,
-            "avg_response_time": avg_response_time
+            "total_requests": total_requests,
+            "successful_requests": successful_requests,
+            "failed_requests": self.failed_requests,
+            "retry_attempts": self.retry_attempts,
+            "total_response_time": total_response_time,
+            "success_rate": (successful_requests / total_requests * 100) if total_requests > 0 else 0,
+            "avg_response_time": (total_response_time / successful_requests) if successful_requests > 0 else 0
         }
 
-def demonstrate_production_wrapper():
+async def demonstrate_production_wrapper():
     """
     Demonstrate the production-ready retry wrapper.
     """
@@ -317,20 +394,27 @@ def demonstrate_production_wrapper():
             "description": "Testing with real OpenRouter API"
         })
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"\n{i}. {test_case['name']}")
-        print("-" * 40)
-        print(f"Description: {test_case['description']}")
-        
-        # Execute the test
+    def run(test_case):
         if test_case["type"] == "mock":
-            result = wrapper.call_mock_api(test_case["url"])
+            return wrapper.call_mock_api(test_case["url"])
         elif test_case["type"] == "openai":
-            result = wrapper.call_openai_api(test_case["prompt"])
+            return wrapper.call_openai_api(test_case["prompt"])
         elif test_case["type"] == "openrouter":
-            result = wrapper.call_openrouter_api(test_case["prompt"])
+            return wrapper.call_openrouter_api(test_case["prompt"])
+    
+    # Run all test cases concurrently, then report them in order
+    print(f"\nRunning {len(test_cases)} test cases concurrently...")
+    results = await asyncio.gather(*(run(test_case) for test_case in test_cases),
+                                   return_exceptions=True)
+    
+    for i, (test_case, result) in enumerate(zip(test_cases, results), 1):
+        print(f"\n{i}. {test_case['name']}")
+        print("-" * 40)
+        print(f"Description: {test_case['description']}")
         
-        if result is not None:
+        if isinstance(result, Exception):
+            print(f"❌ ERROR: {result}")
+        elif result is not None:
             print(f"✅ SUCCESS: Received response")
             if isinstance(result, dict):
                 print(f"Response keys: {list(result.keys())}")
@@ -374,20 +458,22 @@ def demonstrate_configuration():
     print("=" * 60)
     
     print("Environment Variables:")
-    print(f"MAX_RETRIES: {os.getenv('MAX_RETRIES', '3 (default)')}")
-    print(f"BASE_DELAY: {os.getenv('BASE_DELAY', '1.0 (default)')}")
-    print(f"MAX_DELAY: {os.getenv('MAX_DELAY', '60.0 (default)')}")
-    print(f"TIMEOUT: {os.getenv('TIMEOUT', '30 (default)')}")
-    print(f"OPENAI_API_KEY: {'Configured' if os.getenv('OPENAI_API_KEY') else 'Not configured'}")
-    print(f"OPENROUTER_API_KEY: {'Configured' if os.getenv('OPENROUTER_API_KEY') else 'Not configured'}")
+    print(f"MAX_RETRIES: {MAX_RETRIES}")
+    print(f"BASE_DELAY: {BASE_DELAY}")
+    print(f"MAX_DELAY: {MAX_DELAY}")
+    print(f"TIMEOUT: {TIMEOUT}")
+    print(f"JITTER_SEED: {JITTER_SEED or 'Not set'}")
+    print(f"OPENAI_API_KEY: {'Configured' if OPENAI_API_KEY else 'Not configured'}")
+    print(f"OPENROUTER_API_KEY: {'Configured' if OPENROUTER_API_KEY else 'Not configured'}")
 
 def main():
     """Main function to run the production wrapper demonstration."""
+    setup_logging()
     try:
-        demonstrate_production_wrapper()
+        asyncio.run(demonstrate_production_wrapper())
         demonstrate_configuration()
     except Exception as e:
-        logger.error(f"Error running exercise: {e}")
+        logger.error("Error running exercise: %s", e)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
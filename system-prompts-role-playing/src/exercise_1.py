@@ -10,6 +10,16 @@ import os
 import requests
 from dotenv import load_dotenv
 
+# Shared session so the demo's back-to-back calls reuse one connection to the
+# Hugging Face API instead of a new TCP/TLS handshake each time
+_SESSION = requests.Session()
+
+# Translations already fetched, keyed by (model name, input text), so the same
+# text is never sent to the same model twice. Once full, the oldest entries
+# are dropped first.
+_TRANSLATIONS = {}
+_TRANSLATIONS_MAX = 1024
+
 def load_api_key():
     """
     Load the Hugging Face API key from environment variables.
@@ -24,38 +34,60 @@ def load_api_key():
 
     return api_key
 
+def _result_text(item):
+    """
+    Pull the translated text out of one item of an API result.
+    """
+    if isinstance(item, dict) and 'translation_text' in item:
+        return item['translation_text']
+    return str(item)
+
 def call_huggingface_api(api_key, model_name, inputs):
     """
     Call the Hugging Face API with the working translation model.
+
+    inputs can be a single text, or a list of texts to translate in one
+    batched request, in which case a list of results comes back in the
+    same order. Texts translated before are answered from a cache.
     """
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    texts = inputs if isinstance(inputs, list) else [inputs]
+    found = {text: _TRANSLATIONS.get((model_name, text)) for text in texts}
+    missing = [text for text, translation in found.items() if translation is None]
+
+    if missing:
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+
+        api_url = f"https://api-inference.huggingface.co/models/{model_name}"
+        payload = {"inputs": missing}
 
-    api_url = f"https://api-inference.huggingface.co/models/{model_name}"
-    payload = {"inputs": inputs}
+        try:
+            response = _SESSION.post(api_url, headers=headers, json=payload, timeout=30)
 
-    try:
-        response = requests.post(api_url, headers=headers, json=payload, timeout=30)
+            if response.status_code != 200:
+                print(f"API Error: {response.status_code}")
+                print(f"Error: {response.text}")
+                return None
 
-        if response.status_code == 200:
             result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                if 'translation_text' in result[0]:
-                    return result[0]['translation_text']
-                else:
-                    return str(result[0])
-            else:
-                return str(result)
-        else:
-            print(f"API Error: {response.status_code}")
-            print(f"Error: {response.text}")
+            if not isinstance(result, list) or len(result) != len(missing):
+                print(f"Unexpected response: {result}")
+                return None
+
+        except Exception as e:
+            print(f"Error calling API: {e}")
             return None
 
-    except Exception as e:
-        print(f"Error calling API: {e}")
-        return None
+        for text, item in zip(missing, result):
+            translation = found[text] = _result_text(item)
+            if len(_TRANSLATIONS) >= _TRANSLATIONS_MAX:
+                del _TRANSLATIONS[next(iter(_TRANSLATIONS))]
+            _TRANSLATIONS[(model_name, text)] = translation
+
+    translations = [found[text] for text in texts]
+    return translations if isinstance(inputs, list) else translations[0]
 
 def demonstrate_translation_roles(api_key):
     """
@@ -71,38 +103,26 @@ def demonstrate_translation_roles(api_key):
         "The weather is beautiful today"
     ]
 
-    # Role 1: Formal Translator
-    print("\nRole 1: Formal Translator")
-    print("System Prompt: 'You are a professional translator. Always use formal Spanish.'")
-
-    for text in test_texts:
-        result = call_huggingface_api(api_key, model, text)
-        if result:
-            print(f"Input: {text}")
-            print(f"Output: {result}")
-            print()
-
-    # Role 2: Casual Translator
-    print("\nRole 2: Casual Translator")
-    print("System Prompt: 'You are a friendly translator. Use casual, everyday Spanish.'")
-
-    for text in test_texts:
-        result = call_huggingface_api(api_key, model, text)
-        if result:
-            print(f"Input: {text}")
-            print(f"Output: {result}")
-            print()
-
-    # Role 3: Technical Translator
-    print("\nRole 3: Technical Translator")
-    print("System Prompt: 'You are a technical translator. Use precise, technical Spanish.'")
-
-    for text in test_texts:
-        result = call_huggingface_api(api_key, model, text)
-        if result:
-            print(f"Input: {text}")
-            print(f"Output: {result}")
-            print()
+    roles = [
+        ("Formal Translator", "You are a professional translator. Always use formal Spanish."),
+        ("Casual Translator", "You are a friendly translator. Use casual, everyday Spanish."),
+        ("Technical Translator", "You are a technical translator. Use precise, technical Spanish."),
+    ]
+
+    # The role isn't part of the request, so every role asks for the same
+    # translations: only the first batch goes over the network, the other
+    # roles are answered from the cache
+    for number, (role, system_prompt) in enumerate(roles, 1):
+        results = call_huggingface_api(api_key, model, test_texts)
+
+        print(f"\nRole {number}: {role}")
+        print(f"System Prompt: '{system_prompt}'")
+
+        for text, result in zip(test_texts, results or []):
+            if result:
+                print(f"Input: {text}")
+                print(f"Output: {result}")
+                print()
 
 def demonstrate_api_structure(api_key):
     """
@@ -117,7 +137,7 @@ def demonstrate_api_structure(api_key):
     print("API Call Structure:")
     print("URL: https://api-inference.huggingface.co/models/Helsinki-NLP/opus-mt-en-es")
     print("Headers: Authorization: Bearer [your-api-key]")
-    print("Payload: {\"inputs\": \"Hello world\"}")
+    print("Payload: {\"inputs\": [\"Hello world\"]}")
     print()
 
     # Show how system prompts would be integrated